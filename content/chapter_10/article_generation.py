@@ -1,7 +1,9 @@
+import asyncio
+import re
 from langchain.chains import LLMChain
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, NamedTuple, Optional, Tuple, Type
+from langchain.globals import get_llm_cache
 from langchain_community.vectorstores.chroma import Chroma
-from langchain_openai.embeddings import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.memory import ConversationSummaryBufferMemory
 from langchain_openai.chat_models import ChatOpenAI
@@ -10,13 +12,75 @@ from langchain_core.prompts import (
     HumanMessagePromptTemplate,
     MessagesPlaceholder,
 )
-from langchain_core.messages import SystemMessage
+from langchain_core.caches import BaseCache
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.vectorstores import VectorStore
+from pydantic.v1 import PrivateAttr
+
+# Custom imports:
+from embedding_cache import CachedEmbeddings, default_embeddings
+from token_ledger import TokenLedger
+from vector_index import NumpyVectorStore
+
+# Marks the start of each section in the de-duplication pass:
+SECTION_MARKER = "<<<SECTION {index}>>>"
+SECTION_MARKER_PATTERN = re.compile(r"^<<<SECTION \d+>>>[ \t]*$", re.MULTILINE)
+
+
+class BlogPostEvent(NamedTuple):
+    """
+    An event of ContentGenerator.astream_blog_post().
+
+    A "token" event carries the next piece of text of a section, and a
+    "section" event carries the complete text of a section once it is done.
+    """
+
+    kind: str
+    section_index: int
+    text: str
 
 
 class OnlyStoreAIMemory(ConversationSummaryBufferMemory):
+    _token_ledger: Optional[TokenLedger] = PrivateAttr(default=None)
+
+    @property
+    def token_ledger(self) -> TokenLedger:
+        # Build the ledger lazily, as the llm is only available after validation:
+        if self._token_ledger is None:
+            self._token_ledger = TokenLedger.from_llm(self.llm)
+            self._token_ledger.extend(self.chat_memory.messages)
+        return self._token_ledger
+
     def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
         input_str, output_str = self._get_input_output(inputs, outputs)
+        # Build the ledger before adding the message, or it would be counted twice:
+        token_ledger = self.token_ledger
         self.chat_memory.add_ai_message(output_str)
+        token_ledger.append(self.chat_memory.messages[-1])
+        self.prune()
+
+    def prune(self) -> None:
+        """Summarizes the oldest messages once the ledger's running total exceeds max_token_limit."""
+        if self.token_ledger.total <= self.max_token_limit:
+            return
+        buffer = self.chat_memory.messages
+        pruned_memory = []
+        while buffer and self.token_ledger.total > self.max_token_limit:
+            pruned_memory.append(buffer.pop(0))
+            self.token_ledger.popleft()
+        self.moving_summary_buffer = self.predict_new_summary(
+            pruned_memory, self.moving_summary_buffer
+        )
+
+    def clear(self) -> None:
+        super().clear()
+        self.token_ledger.clear()
 
 
 class ContentGenerator:
@@ -27,11 +91,24 @@ class ContentGenerator:
         questions_and_answers: dict,
         chunk_size: int = 400,
         chunk_overlap: int = 100,
+        text_splitter: Optional[Any] = None,
+        llm: Optional[BaseChatModel] = None,
+        vector_store_cls: Type[VectorStore] = Chroma,
+        embeddings: Optional[Embeddings] = None,
     ):
-        self.embeddings = OpenAIEmbeddings()
-        self.text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        # Share one set of cached embeddings across articles, so unchanged chunks
+        # are not embedded again, see default_embeddings():
+        self.embeddings = embeddings if embeddings is not None else default_embeddings()
+        # Any splitter with a split_documents() method can be passed in, e.g. the
+        # SentenceChunker from chapter 3, which never cuts a sentence in half:
+        self.text_splitter = (
+            text_splitter
+            or RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+                chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            )
         )
+        # Chroma, or e.g. the in-process NumpyVectorStore for a few hundred chunks:
+        self.vector_store_cls = vector_store_cls
         self.topic = topic
         self.outline = outline
         self.questions_and_answers = questions_and_answers
@@ -43,7 +120,7 @@ class ContentGenerator:
         ---
         Use your previous AI messages to avoid repeating yourself as you continually re-write the blog post sections.
         """
-        chat = ChatOpenAI(model="gpt-3.5-turbo-16k")
+        chat = llm if llm is not None else ChatOpenAI(model="gpt-3.5-turbo-16k")
         memory = OnlyStoreAIMemory(
             llm=chat,
             memory_key="chat_history",
@@ -62,33 +139,99 @@ class ContentGenerator:
         self.blog_post_chain = LLMChain(
             llm=chat, prompt=chat_prompt, memory=memory, output_key="blog_post"
         )
+        # The same prompt without memory, for sections that are written concurrently:
+        self.section_chain = chat_prompt | chat | StrOutputParser()
+        self.chat_prompt = chat_prompt
+        self.chat = chat
         self.chroma_db = None
+        self._relevant_documents: Dict[str, List[Document]] = {}
 
     def split_and_vectorize_documents(self, text_documents):
         chunked_docs = self.text_splitter.split_documents(text_documents)
-        self.chroma_db = Chroma.from_documents(chunked_docs, embedding=self.embeddings)  # type: ignore
+        self.chroma_db = self.vector_store_cls.from_documents(chunked_docs, embedding=self.embeddings)  # type: ignore
+        self._relevant_documents = {}
         return self.chroma_db
 
-    def generate_blog_post(self) -> List[str]:
-        blog_post = []
-        print("Generating the blog post...\n---")
-        for subheading in self.outline.sub_headings:
-            k = 5  # Initialize k
-            while k >= 0:
-                try:
-                    relevant_documents = self.chroma_db.as_retriever().invoke(  # type: ignore
-                        subheading.title, k=k
-                    )
-                    break
-                except Exception as e:
-                    print(f"An error occurred: {e}")
-                    k -= 1
-                if k < 0:
-                    print(
-                        "All attempts to fetch relevant documents have failed. Using an empty string for relevant_documents."
-                    )
-                    relevant_documents = ""
-            section_prompt = f"""
+    def retrieve_relevant_documents(
+        self, titles: List[str], k: int = 5
+    ) -> Dict[str, List[Document]]:
+        """
+        Fetches the k most relevant chunks for every title, with one query for Chroma and the NumpyVectorStore.
+
+        Results are cached by title, so each subheading is only retrieved once.
+        """
+        missing_titles = [
+            title
+            for title in dict.fromkeys(titles)
+            if title not in self._relevant_documents
+        ]
+        if missing_titles and self.chroma_db is not None:
+            for title, documents in zip(
+                missing_titles, self._query_vector_store(missing_titles, k)
+            ):
+                self._relevant_documents[title] = documents
+        return {title: self._relevant_documents.get(title, []) for title in titles}
+
+    def _embed_queries(self, titles: List[str]) -> List[List[float]]:
+        # CachedEmbeddings embeds every uncached title in one call. Other embeddings
+        # get one embed_query call per title, as asymmetric models embed queries differently:
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.embed_queries(titles)
+        return [self.embeddings.embed_query(title) for title in titles]
+
+    def _query_vector_store(self, titles: List[str], k: int) -> List[List[Document]]:
+        query_embeddings = self._embed_queries(titles)
+        if isinstance(self.chroma_db, NumpyVectorStore):
+            return [
+                [document for document, _ in results]
+                for results in self.chroma_db.similarity_search_by_vectors(
+                    query_embeddings, k
+                )
+            ]
+        if not isinstance(self.chroma_db, Chroma):
+            # Any other vector store is searched through its public API, one title at a time:
+            return [
+                self.chroma_db.similarity_search_by_vector(embedding, k=k)  # type: ignore
+                for embedding in query_embeddings
+            ]
+
+        collection = self.chroma_db._collection
+        # Never ask for more results than there are chunks:
+        k = min(k, collection.count())
+        if k == 0:
+            return [[] for _ in titles]
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=["documents", "metadatas"],
+        )
+        return [
+            [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(texts, metadatas)
+            ]
+            for texts, metadatas in zip(results["documents"], results["metadatas"])
+        ]
+
+    def _prefetch_relevant_documents(self) -> None:
+        try:
+            self.retrieve_relevant_documents(
+                [subheading.title for subheading in self.outline.sub_headings]
+            )
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    def _retrieve_relevant_documents(self, subheading: Any) -> Any:
+        relevant_documents = self._relevant_documents.get(subheading.title)
+        if not relevant_documents:
+            print(
+                "No relevant documents were found. Using an empty string for relevant_documents."
+            )
+            return ""
+        return relevant_documents
+
+    def _section_prompt(self, subheading: Any, relevant_documents: Any) -> str:
+        return f"""
             You are currently writing the section: {subheading.title}
             ---
             Here are the relevant documents for this section: {relevant_documents}.
@@ -106,8 +249,145 @@ class ContentGenerator:
             ---
             Section text: 
             """
+
+    def generate_blog_post(self) -> List[str]:
+        blog_post = []
+        print("Generating the blog post...\n---")
+        self._prefetch_relevant_documents()
+        for subheading in self.outline.sub_headings:
+            relevant_documents = self._retrieve_relevant_documents(subheading)
+            section_prompt = self._section_prompt(subheading, relevant_documents)
             result = self.blog_post_chain.predict(human_input=section_prompt)
             blog_post.append(result)
 
         print("Finished generating the blog post!\n---")
         return blog_post
+
+    async def astream_blog_post(self) -> AsyncIterator[BlogPostEvent]:
+        """
+        Writes the blog post section by section like generate_blog_post(), but
+        yields the text as it is generated instead of only returning at the end.
+        """
+        memory = self.blog_post_chain.memory
+        print("Generating the blog post...\n---")
+        self._prefetch_relevant_documents()
+        for section_index, subheading in enumerate(self.outline.sub_headings):
+            relevant_documents = self._retrieve_relevant_documents(subheading)
+            section_prompt = self._section_prompt(subheading, relevant_documents)
+            chat_history = memory.load_memory_variables({})["chat_history"]  # type: ignore
+            messages = self.chat_prompt.format_messages(
+                chat_history=chat_history, human_input=section_prompt
+            )
+
+            # Streaming bypasses the LLM cache, so it is checked here instead. In
+            # replay mode a miss raises ReplayCacheMiss rather than calling the model:
+            cache_key = self._llm_cache_key(messages)
+            cached = None
+            if cache_key is not None:
+                cache, prompt, llm_string = cache_key
+                cached = await cache.alookup(prompt, llm_string)
+            if cached:
+                section_text = cached[0].text
+                yield BlogPostEvent("token", section_index, section_text)
+            else:
+                pieces = []
+                async for token in self.section_chain.astream(
+                    {"chat_history": chat_history, "human_input": section_prompt}
+                ):
+                    pieces.append(token)
+                    yield BlogPostEvent("token", section_index, token)
+                section_text = "".join(pieces)
+                if cache_key is not None:
+                    await cache.aupdate(
+                        prompt,
+                        llm_string,
+                        [ChatGeneration(message=AIMessage(content=section_text))],
+                    )
+
+            # Save the section like blog_post_chain does, which may summarize older sections:
+            await asyncio.to_thread(
+                memory.save_context,  # type: ignore
+                {"human_input": section_prompt},
+                {"blog_post": section_text},
+            )
+            yield BlogPostEvent("section", section_index, section_text)
+        print("Finished generating the blog post!\n---")
+
+    def _llm_cache_key(
+        self, messages: List[BaseMessage]
+    ) -> Optional[Tuple[BaseCache, str, str]]:
+        """Returns the cache the chat model would use, with the prompt and llm_string of its key."""
+        if self.chat.cache is False:
+            return None
+        cache = self.chat.cache if isinstance(self.chat.cache, BaseCache) else get_llm_cache()
+        if cache is None:
+            return None
+        return cache, dumps(messages), self.chat._get_llm_string()
+
+    async def agenerate_blog_post(
+        self, max_concurrency: int = 4, deduplicate: bool = False
+    ) -> List[str]:
+        """
+        Writes the sections of the blog post concurrently.
+
+        Instead of reading the memory left by the section before it, every
+        section reads the same snapshot of the memory taken before the first
+        one starts. As the sections cannot see each other, an optional final
+        pass rewrites them together to remove repeated content.
+
+        Args:
+            max_concurrency: The maximum number of sections written at a time.
+            deduplicate: Whether to run the de-duplication pass.
+
+        Returns:
+            The sections in outline order.
+        """
+        print("Generating the blog post...\n---")
+        self._prefetch_relevant_documents()
+        chat_history = self.blog_post_chain.memory.load_memory_variables({})[  # type: ignore
+            "chat_history"
+        ]
+        section_inputs = [
+            {
+                "chat_history": chat_history,
+                "human_input": self._section_prompt(
+                    subheading, self._retrieve_relevant_documents(subheading)
+                ),
+            }
+            for subheading in self.outline.sub_headings
+        ]
+        blog_post = await self.section_chain.abatch(
+            section_inputs, config={"max_concurrency": max_concurrency}
+        )
+        if deduplicate:
+            blog_post = await self.adeduplicate_sections(blog_post)
+
+        print("Finished generating the blog post!\n---")
+        return blog_post
+
+    async def adeduplicate_sections(self, sections: List[str]) -> List[str]:
+        """Rewrites sections that were written independently, so that they do not repeat each other."""
+        marked_sections = "\n".join(
+            f"{SECTION_MARKER.format(index=i)}\n{section}"
+            for i, section in enumerate(sections)
+        )
+        deduplication_prompt = f"""
+            The following sections of the blog post were written independently and may repeat each other.
+            Rewrite them so that each point is only made once, in the section where it fits best.
+            ---
+            You must keep every section, its heading and its .md format.
+            You must start each section with the same marker line as below, e.g. {SECTION_MARKER.format(index=0)}
+            ---
+            {marked_sections}
+            """
+        result = await self.chat.ainvoke(deduplication_prompt)
+        rewritten = [
+            section.strip() for section in SECTION_MARKER_PATTERN.split(result.content)[1:]
+        ]
+        # Keep the original sections if the markers were not preserved:
+        if len(rewritten) != len(sections):
+            print(
+                "The de-duplication pass lost the section markers, keeping the originals."
+            )
+            return sections
+        return rewritten
@@ -1,4 +1,4 @@
-from typing import List, Any
+from typing import TYPE_CHECKING, List, Any, Optional
 from pydantic.v1 import BaseModel
 
 
@@ -18,12 +18,22 @@ from langchain_openai.chat_models import ChatOpenAI
 
 # Custom types:
 from custom_summarize_chain import DocumentSummary
+from semantic_cache import describe_summaries, exact_key
+
+if TYPE_CHECKING:
+    from semantic_cache import SemanticCache
 
 
 class BlogOutlineGenerator:
-    def __init__(self, topic: str, questions_and_answers: Any):
+    def __init__(
+        self,
+        topic: str,
+        questions_and_answers: Any,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
         self.topic = topic
         self.questions_and_answers = questions_and_answers
+        self.semantic_cache = semantic_cache
 
         # Create a prompt
         prompt_content = """
@@ -49,13 +59,24 @@ class BlogOutlineGenerator:
 
     def generate_outline(self, summaries: List[DocumentSummary]) -> Any:
         print("Generating the outline...\n---")
-        result = self.outline_chain.invoke(
-            {
-                "topic": self.topic,
-                "document_summaries": [s.dict() for s in summaries],
-                "interview_questions_and_answers": self.questions_and_answers,
-                "format_instructions": self.parser.get_format_instructions(),
-            }
-        )
+        inputs = {
+            "topic": self.topic,
+            "document_summaries": [s.dict() for s in summaries],
+            "interview_questions_and_answers": self.questions_and_answers,
+            "format_instructions": self.parser.get_format_instructions(),
+        }
+
+        # Reuse the outline of a similar topic and summaries, but only for the same answers:
+        if self.semantic_cache is not None:
+            namespace = "outline:" + exact_key(inputs["interview_questions_and_answers"])
+            description = describe_summaries(self.topic, summaries)
+            cached_outline = self.semantic_cache.lookup(namespace, description)
+            if cached_outline is not None:
+                print("Reused a cached outline!\n---")
+                return cached_outline
+
+        result = self.outline_chain.invoke(inputs)
+        if self.semantic_cache is not None:
+            self.semantic_cache.update(namespace, description, result)
         print("Finished generating the outline!\n---")
         return result
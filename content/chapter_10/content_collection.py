@@ -1,23 +1,157 @@
 from langchain_community.document_loaders import AsyncChromiumLoader
 from langchain_community.document_transformers import Html2TextTransformer
 from langchain_core.documents import Document
+import asyncio
+from concurrent.futures import Executor
 import os
 import pandas as pd
+import requests
 from serpapi import GoogleSearch
-from typing import List
+from typing import Dict, List, Optional
+
+# Custom imports:
+from html_extraction import aiter_html_to_text
+from near_duplicates import deduplicate_documents
+from scrape_cache import ScrapeCache
 
 
 class ChromiumLoader(AsyncChromiumLoader):
+    def __init__(
+        self,
+        urls: List[str],
+        max_concurrency: int = 5,
+        timeout: float = 30.0,
+        headless: bool = True,
+    ):
+        super().__init__(urls)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "ChromiumLoader":
+        from playwright.async_api import async_playwright
+
+        # Share one browser across all of the pages:
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self._browser.close()
+        finally:
+            await self._playwright.stop()
+            self._playwright = self._browser = self._semaphore = None
+
+    @staticmethod
+    async def _load_page(page, url: str, metadata: Dict[str, str]) -> str:
+        response = await page.goto(url)
+        if response is not None:
+            # Keep the validators, so the page can be refetched conditionally:
+            for header, key in (("etag", "etag"), ("last-modified", "last_modified")):
+                if header in response.headers:
+                    metadata[key] = response.headers[header]
+        return await page.content()
+
+    async def ascrape_document(self, url: str) -> Document:
+        """Scrapes a single URL with the shared browser. Must be used inside `async with loader:`."""
+        metadata = {"source": url}
+        async with self._semaphore:
+            context = None
+            try:
+                # Each page gets its own context, so cookies and crashes stay isolated:
+                context = await self._browser.new_context()
+                page = await context.new_page()
+                # The timeout covers both loading the page and reading its content:
+                text = await asyncio.wait_for(
+                    self._load_page(page, url, metadata), timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                text = f"Error: timed out after {self.timeout} seconds"
+            except Exception as e:
+                # Match AsyncChromiumLoader, which returns errors as the page content:
+                text = f"Error: {e}"
+            finally:
+                if context is not None:
+                    await context.close()
+        return Document(page_content=text, metadata=metadata)
+
     async def load(self):
-        raw_text = [await self.ascrape_playwright(url) for url in self.urls]
-        # Return the raw documents:
-        return [Document(page_content=text) for text in raw_text]
+        async with self:
+            # Return the raw documents, in the same order as the URLs:
+            return await asyncio.gather(
+                *[self.ascrape_document(url) for url in self.urls]
+            )
 
 
-async def get_html_content_from_urls(
-    df: pd.DataFrame, number_of_urls: int = 3, url_column: str = "link"
+def _is_not_modified(url: str, headers: Dict[str, str], timeout: float = 10.0) -> bool:
+    # Pages without an ETag or Last-Modified header cannot be revalidated:
+    if not headers:
+        return False
+    try:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            return response.status_code == 304
+    except requests.RequestException:
+        return False
+
+
+async def load_cached_page(url: str, cache: ScrapeCache) -> Optional[Document]:
+    """
+    Returns the cached page for a url, or None if it has to be scraped again.
+
+    A stale page with an ETag or Last-Modified header is revalidated with a
+    conditional request, and reused if the server answers 304 Not Modified.
+    A page that already has extracted text carries it in
+    metadata["extracted_text"], so extract_text_from_webpages() can skip it.
+    """
+    page = cache.get(url)
+    if page is None:
+        return None
+    if not page.is_fresh:
+        headers = cache.conditional_headers(page)
+        if not await asyncio.to_thread(_is_not_modified, url, headers):
+            return None
+        cache.touch(url)
+    metadata = {"source": url}
+    if page.text is not None:
+        metadata["extracted_text"] = page.text
+    return Document(page_content=page.html, metadata=metadata)
+
+
+def cache_scraped_page(cache: ScrapeCache, document: Document) -> None:
+    if not document.page_content.startswith("Error:"):
+        cache.put(
+            document.metadata["source"],
+            document.page_content,
+            etag=document.metadata.get("etag"),
+            last_modified=document.metadata.get("last_modified"),
+        )
+
+
+async def load_with_cache(
+    urls: List[str], cache: ScrapeCache, max_concurrency: int = 5
 ) -> List[Document]:
-    # Get the HTML content of the first 3 URLs:
+    """Loads pages from the cache and only scrapes the ones that are missing or changed, see load_cached_page()."""
+    cached = dict(
+        zip(urls, await asyncio.gather(*[load_cached_page(url, cache) for url in urls]))
+    )
+
+    missing = [url for url, document in cached.items() if document is None]
+    if missing:
+        for document in await ChromiumLoader(missing, max_concurrency=max_concurrency).load():
+            cached[document.metadata["source"]] = document
+            cache_scraped_page(cache, document)
+    return [cached[url] for url in urls]
+
+
+def get_urls_from_serp_results(
+    df: pd.DataFrame, number_of_urls: int = 3, url_column: str = "link"
+) -> List[str]:
+    # Get the first 3 URLs:
     urls = df[url_column].values[:number_of_urls].tolist()
 
     # If there is only one URL, convert it to a list:
@@ -27,26 +161,91 @@ async def get_html_content_from_urls(
     # Check for empty URLs:
     urls = [url for url in urls if url != ""]
 
-    # Check for duplicate URLs:
-    urls = list(set(urls))
+    # Check for duplicate URLs, keeping the SERP ranking order:
+    urls = list(dict.fromkeys(urls))
 
     # Throw error if no URLs are found:
     if len(urls) == 0:
         raise ValueError("No URLs found!")
+    return urls
+
+
+async def get_html_content_from_urls(
+    df: pd.DataFrame,
+    number_of_urls: int = 3,
+    url_column: str = "link",
+    max_concurrency: int = 5,
+    cache: Optional[ScrapeCache] = None,
+) -> List[Document]:
+    # Get the HTML content of the first 3 URLs:
+    urls = get_urls_from_serp_results(df, number_of_urls, url_column)
+
+    if cache is not None:
+        return await load_with_cache(urls, cache, max_concurrency=max_concurrency)
+
     # loader = AsyncHtmlLoader(urls) # Faster but might not always work.
-    loader = ChromiumLoader(urls)
+    loader = ChromiumLoader(urls, max_concurrency=max_concurrency)
     docs = await loader.load()
     return docs
 
 
-def extract_text_from_webpages(documents: List[Document]):
+def reuse_extracted_text(documents: List[Document]) -> Dict[int, Document]:
+    """Returns the text documents that were extracted on a previous run, by position."""
+    return {
+        i: Document(
+            page_content=d.metadata["extracted_text"],
+            metadata={"source": d.metadata["source"]},
+        )
+        for i, d in enumerate(documents)
+        if "extracted_text" in d.metadata
+    }
+
+
+def cache_extracted_text(
+    cache: Optional[ScrapeCache], html_document: Document, text_document: Document
+) -> None:
+    source = text_document.metadata.get("source")
+    if cache is not None and source and not html_document.page_content.startswith("Error:"):
+        cache.put_text(source, text_document.page_content)
+
+
+def extract_text_from_webpages(
+    documents: List[Document], cache: Optional[ScrapeCache] = None
+):
+    text_documents = reuse_extracted_text(documents)
+    to_transform = [i for i in range(len(documents)) if i not in text_documents]
+
     html2text = Html2TextTransformer()
-    return html2text.transform_documents(documents)
+    transformed = html2text.transform_documents([documents[i] for i in to_transform])
+    for i, text_document in zip(to_transform, transformed):
+        cache_extracted_text(cache, documents[i], text_document)
+        text_documents[i] = text_document
+    return [text_documents[i] for i in range(len(documents))]
 
 
-async def collect_serp_data_and_extract_text_from_webpages(
-    topic: str,
+async def aextract_text_from_webpages(
+    documents: List[Document],
+    cache: Optional[ScrapeCache] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = 4,
 ) -> List[Document]:
+    """
+    Extracts the text from webpages in a process pool, so the CPU-bound HTML-to-text
+    conversion does not block the event loop.
+    """
+    text_documents = reuse_extracted_text(documents)
+    to_transform = [i for i in range(len(documents)) if i not in text_documents]
+
+    async for index, text_document in aiter_html_to_text(
+        [documents[i] for i in to_transform], executor=executor, chunk_size=chunk_size
+    ):
+        i = to_transform[index]
+        cache_extracted_text(cache, documents[i], text_document)
+        text_documents[i] = text_document
+    return [text_documents[i] for i in range(len(documents))]
+
+
+def search_serp_results(topic: str) -> pd.DataFrame:
     search = GoogleSearch(
         {
             "q": topic,
@@ -58,12 +257,24 @@ async def collect_serp_data_and_extract_text_from_webpages(
     result = search.get_dict()
 
     # Put the results in a Pandas DataFrame:
-    serp_results = pd.DataFrame(result["organic_results"])
+    return pd.DataFrame(result["organic_results"])
+
+
+async def collect_serp_data_and_extract_text_from_webpages(
+    topic: str,
+    cache: Optional[ScrapeCache] = None,
+    near_duplicate_threshold: Optional[float] = 0.8,
+) -> List[Document]:
+    serp_results = search_serp_results(topic)
 
     # Extract the html content from the URLs:
-    html_documents = await get_html_content_from_urls(serp_results)
+    html_documents = await get_html_content_from_urls(serp_results, cache=cache)
 
     # Extract the text from the URLs:
-    text_documents = extract_text_from_webpages(html_documents)
+    text_documents = await aextract_text_from_webpages(html_documents, cache=cache)
+
+    # Drop syndicated or mirrored pages before they are summarized:
+    if near_duplicate_threshold is not None:
+        text_documents = deduplicate_documents(text_documents, near_duplicate_threshold)
 
     return text_documents
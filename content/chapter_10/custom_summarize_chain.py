@@ -1,15 +1,24 @@
-import asyncio
+import httpx
 from langchain_openai.chat_models import ChatOpenAI
 from langchain.output_parsers import PydanticOutputParser
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
 from pydantic.v1 import BaseModel
 from langchain.chains import LLMChain
 from langchain.chains.combine_documents.stuff import StuffDocumentsChain
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import asyncio
+from itertools import accumulate
 import time
 from langchain_core.prompts import PromptTemplate
 
+# Custom imports:
+from rate_limiter import RateLimitedScheduler, count_prompt_tokens
+
+# Tokens reserved for each summary when checking the tokens-per-minute limit:
+SUMMARY_COMPLETION_TOKENS = 500
+
 
 class DocumentSummary(BaseModel):
     concise_summary: str
@@ -21,24 +30,7 @@ class DocumentSummary(BaseModel):
     ] = {}  # This comes natively from the LangChain document loader
 
 
-async def create_summary_from_text(
-    document: Document,
-    parser: PydanticOutputParser,
-    llm: ChatOpenAI,
-    text_splitter: RecursiveCharacterTextSplitter,
-) -> Union[DocumentSummary, None]:
-    # Split the parent document into chunks:
-    split_docs = text_splitter.split_documents([document])
-
-    # If there are no documents after splitting, return None:
-    if len(split_docs) == 0:
-        return None
-
-    # Get the first document, which will be the only document to be summarized:
-    first_document = split_docs[0]
-
-    # Run a refine summarization chain that extracts unique key points and opinions within an article:
-    prompt_template = """Act as a content SEO researcher. You are interested in summarizing and extracting key points from the following text. 
+SUMMARY_PROMPT_TEMPLATE = """Act as a content SEO researcher. You are interested in summarizing and extracting key points from the following text. 
     The insights gained will be used to do content research and we will compare the key points, insights and summaries across multiple articles.
     ---
     - You must analyze the text and extract the key points and opinions from the following text
@@ -47,45 +39,294 @@ async def create_summary_from_text(
     {format_instructions}
     """
 
-    # Define LLM chain
-    llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo-16k")
-    llm_chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template(prompt_template))
+REDUCE_PROMPT_TEMPLATE = """Act as a content SEO researcher. The following JSON summaries each cover a consecutive part of the same article.
+    Combine them into a single summary of the whole article.
+    ---
+    - You must keep every distinct key point and expert opinion, and merge the ones that repeat each other
+    - The concise summary must cover the whole article, not only its first part:
+    {summaries}
+    {format_instructions}
+    """
 
-    print("Summarizing the data!")
 
-    # Start time:
-    start_time = time.time()
-    stuff_chain = StuffDocumentsChain(
-        llm_chain=llm_chain,
-        document_variable_name="text",
+def create_summary_llm(max_connections: int = 20) -> ChatOpenAI:
+    """Creates the summarization model with a pooled HTTP client that keeps its connections alive."""
+    http_async_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
     )
-    summary_result = await stuff_chain.ainvoke(
-        {
-            "input_documents": [first_document],
-            "format_instructions": parser.get_format_instructions(),
-        },
+    return ChatOpenAI(
+        temperature=0, model="gpt-3.5-turbo-16k", http_async_client=http_async_client
     )
-    print(f"Time taken: {time.time() - start_time}")
-    print("Finished summarizing the data!\n---" "")
-    document_summary = parser.parse(summary_result["output_text"])
-    document_summary.metadata = document.metadata
-    return document_summary
+
+
+class DocumentSummarizer:
+    """
+    Summarizes documents with a chain that is built once and reused for every document.
+
+    The model client, its connection pool, the chain and the format
+    instructions of the parser are created in the constructor, so summarizing
+    another document only costs the LLM call itself.
+
+    By default only the first chunk of each document is summarized. With
+    map_reduce, every chunk is summarized concurrently and the partial
+    summaries are then merged by the LLM, reduce_fan_in at a time, until a
+    single summary is left. The latency is one chunk call plus one call per
+    level of the reduce tree.
+
+    Args:
+        parser: Parses the LLM output into a DocumentSummary.
+        text_splitter: Splits each document into chunks.
+        llm: The chat model to use. Defaults to create_summary_llm().
+        map_reduce: Whether to summarize every chunk instead of only the first.
+        max_concurrency: The maximum number of chunk or reduce calls at a time.
+        max_tokens: The token budget of the chunks of a document in map-reduce
+            mode. Longer documents are sampled evenly from start to end.
+        reduce_fan_in: The number of partial summaries merged per reduce call.
+        token_counter: Counts the tokens of a chunk for max_tokens.
+        scheduler: If given, every chunk and reduce call is scheduled on it
+            and charged its own request and tokens. It then limits the calls in
+            flight instead of max_concurrency.
+    """
+
+    def __init__(
+        self,
+        parser: PydanticOutputParser,
+        text_splitter: RecursiveCharacterTextSplitter,
+        llm: Optional[BaseChatModel] = None,
+        map_reduce: bool = False,
+        max_concurrency: int = 5,
+        max_tokens: Optional[int] = None,
+        reduce_fan_in: int = 4,
+        token_counter: Callable[[str], int] = count_prompt_tokens,
+        scheduler: Optional[RateLimitedScheduler] = None,
+    ):
+        if reduce_fan_in < 2:
+            raise ValueError("reduce_fan_in must be at least 2")
+        self.parser = parser
+        self.text_splitter = text_splitter
+        self.llm = llm if llm is not None else create_summary_llm()
+        self.map_reduce = map_reduce
+        self.max_concurrency = max_concurrency
+        self.max_tokens = max_tokens
+        self.reduce_fan_in = reduce_fan_in
+        self.token_counter = token_counter
+        self.scheduler = scheduler
+        self.format_instructions = parser.get_format_instructions()
+        llm_chain = LLMChain(
+            llm=self.llm, prompt=PromptTemplate.from_template(SUMMARY_PROMPT_TEMPLATE)
+        )
+        self.chain = StuffDocumentsChain(
+            llm_chain=llm_chain,
+            document_variable_name="text",
+        )
+        self.reduce_chain = LLMChain(
+            llm=self.llm, prompt=PromptTemplate.from_template(REDUCE_PROMPT_TEMPLATE)
+        )
+
+    def select_chunks(self, document: Document) -> List[Document]:
+        """Returns the chunks of a document that will be summarized."""
+        # Split the parent document into chunks:
+        split_docs = self.text_splitter.split_documents([document])
+        if not self.map_reduce:
+            # Get the first document, which will be the only document to be summarized:
+            return split_docs[:1]
+        if self.max_tokens is None:
+            return split_docs
+
+        # Keep every stride-th chunk, so a capped document is still covered from start to end:
+        token_counts = [self.token_counter(d.page_content) for d in split_docs]
+        for stride in range(1, len(split_docs) + 1):
+            if sum(token_counts[::stride]) <= self.max_tokens:
+                return split_docs[::stride]
+        return split_docs[:1]
+
+    async def _abatch(
+        self,
+        chain: Any,
+        inputs: List[Dict[str, Any]],
+        prompt_texts: List[str],
+        max_concurrency: int,
+    ) -> List[Dict[str, Any]]:
+        if self.scheduler is None:
+            return await chain.abatch(inputs, config={"max_concurrency": max_concurrency})
+        return await asyncio.gather(
+            *[
+                self.scheduler.call(
+                    lambda chain_input=chain_input: chain.ainvoke(chain_input),
+                    self.token_counter(prompt_text) + SUMMARY_COMPLETION_TOKENS,
+                )
+                for chain_input, prompt_text in zip(inputs, prompt_texts)
+            ]
+        )
+
+    async def _amap(
+        self, chunks: List[Document], max_concurrency: int
+    ) -> List[DocumentSummary]:
+        summary_results = await self._abatch(
+            self.chain,
+            [
+                {"input_documents": [chunk], "format_instructions": self.format_instructions}
+                for chunk in chunks
+            ],
+            [chunk.page_content for chunk in chunks],
+            max_concurrency,
+        )
+        return [self.parser.parse(result["output_text"]) for result in summary_results]
+
+    async def _areduce(
+        self, partial_summaries: List[DocumentSummary], max_concurrency: int
+    ) -> DocumentSummary:
+        # Merge the partial summaries level by level, until only one is left:
+        while len(partial_summaries) > 1:
+            groups = [
+                partial_summaries[i : i + self.reduce_fan_in]
+                for i in range(0, len(partial_summaries), self.reduce_fan_in)
+            ]
+            merged_summaries = [
+                "\n".join(summary.json(exclude={"metadata"}) for summary in group)
+                for group in groups
+            ]
+            reduce_results = await self._abatch(
+                self.reduce_chain,
+                [
+                    {"summaries": summaries, "format_instructions": self.format_instructions}
+                    for summaries in merged_summaries
+                ],
+                merged_summaries,
+                max_concurrency,
+            )
+            partial_summaries = [
+                self.parser.parse(result["text"]) for result in reduce_results
+            ]
+        return partial_summaries[0]
+
+    async def _asummarize_all(
+        self, documents: List[Document], max_concurrency: int
+    ) -> List[Optional[DocumentSummary]]:
+        chunks_per_document = [self.select_chunks(document) for document in documents]
+
+        # Map every chunk of every document in one batch, so they share the concurrency limit:
+        all_chunks = [chunk for chunks in chunks_per_document for chunk in chunks]
+        partial_summaries = await self._amap(all_chunks, max_concurrency)
+
+        async def reduce(start: int, count: int) -> Optional[DocumentSummary]:
+            if count == 0:
+                # There was no text to summarize:
+                return None
+            return await self._areduce(
+                partial_summaries[start : start + count], max_concurrency
+            )
+
+        starts = list(accumulate((len(chunks) for chunks in chunks_per_document), initial=0))
+        summaries = await asyncio.gather(
+            *[
+                reduce(start, len(chunks))
+                for start, chunks in zip(starts, chunks_per_document)
+            ]
+        )
+        for document, summary in zip(documents, summaries):
+            if summary is not None:
+                summary.metadata = document.metadata
+        return summaries
+
+    async def asummarize(self, document: Document) -> Optional[DocumentSummary]:
+        print("Summarizing the data!")
+        start_time = time.time()
+        [summary] = await self._asummarize_all([document], self.max_concurrency)
+        print(f"Time taken: {time.time() - start_time}")
+        print("Finished summarizing the data!\n---" "")
+        return summary
+
+    async def abatch(
+        self, documents: List[Document], max_concurrency: Optional[int] = None
+    ) -> List[Optional[DocumentSummary]]:
+        """
+        Summarizes many documents concurrently over the same chain and connection pool.
+
+        Returns:
+            The summaries in the order of documents, with None for documents
+            that have no text to summarize.
+        """
+        print(f"Summarizing {len(documents)} documents!")
+        start_time = time.time()
+        summaries = await self._asummarize_all(
+            documents, max_concurrency or self.max_concurrency
+        )
+        print(f"Time taken: {time.time() - start_time}")
+        return summaries
+
+
+# The summarizers of create_summary_from_text(), by the ids of their parser, llm and splitter.
+# Each summarizer keeps those objects alive, so their ids are never reused:
+_summarizers: Dict[Tuple[int, int, int], DocumentSummarizer] = {}
+
+
+async def create_summary_from_text(
+    document: Document,
+    parser: PydanticOutputParser,
+    llm: BaseChatModel,
+    text_splitter: RecursiveCharacterTextSplitter,
+) -> Union[DocumentSummary, None]:
+    # Build the chain once per llm, not once per document:
+    key = (id(parser), id(llm), id(text_splitter))
+    if key not in _summarizers:
+        _summarizers[key] = DocumentSummarizer(parser, text_splitter, llm)
+    return await _summarizers[key].asummarize(document)
 
 
 async def create_all_summaries(
     text_documents: List[Document],
     parser: PydanticOutputParser,
-    llm: ChatOpenAI,
+    llm: BaseChatModel,
     text_splitter: RecursiveCharacterTextSplitter,
+    scheduler: Optional[RateLimitedScheduler] = None,
+    preserve_order: bool = True,
+    map_reduce: bool = False,
+    max_tokens: Optional[int] = None,
 ) -> List[DocumentSummary]:
-    # Create an array of coroutines:
+    """
+    Summarizes the documents concurrently within the rate limits of the scheduler.
+
+    Args:
+        scheduler: Limits the requests and tokens per minute and the calls in
+            flight. A scheduler with the default limits is used if none is given.
+        preserve_order: Whether the summaries keep the order of text_documents,
+            instead of the order in which they finished.
+        map_reduce: Whether to summarize every chunk of each document instead
+            of only the first, see DocumentSummarizer.
+        max_tokens: The token budget of the chunks of each document in
+            map-reduce mode.
+    """
+    if scheduler is None:
+        scheduler = RateLimitedScheduler()
+    # Every chunk and reduce call is charged to the scheduler, not each document:
+    summarizer = DocumentSummarizer(
+        parser,
+        text_splitter,
+        llm,
+        map_reduce=map_reduce,
+        max_tokens=max_tokens,
+        token_counter=scheduler.token_counter,
+        scheduler=scheduler,
+    )
+
+    # Execute the documents concurrently and gather all the results:
     tasks = [
-        create_summary_from_text(document, parser, llm, text_splitter)
+        asyncio.ensure_future(summarizer.asummarize(document))
         for document in text_documents
     ]
-
-    # Execute the tasks concurrently and gather all the results:
-    results = await asyncio.gather(*tasks)
+    try:
+        if preserve_order:
+            results = await asyncio.gather(*tasks)
+        else:
+            results = [await task for task in asyncio.as_completed(tasks)]
+    finally:
+        # Cancel the remaining documents if one of them failed:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     # Filter out None values
     summaries = [summary for summary in results if summary is not None]
@@ -0,0 +1,277 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Custom imports:
+from response_cache import ReplayCacheMiss, is_replaying
+
+# Where the embeddings are cached by default:
+EMBEDDING_CACHE_DIRECTORY = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    A persistent store of embeddings, keyed by model name and text hash.
+
+    The vectors are appended to a single binary file of float32 or float16
+    values and read back through a memory map, so they are never all loaded
+    into memory. A small SQLite table maps each key to the offset and length
+    of its vector in that file. The directory and files are only created when
+    the store is first used.
+    """
+
+    def __init__(
+        self, directory: str = EMBEDDING_CACHE_DIRECTORY, dtype: str = "float32"
+    ):
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be 'float32' or 'float16'")
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = os.path.join(directory, f"vectors.{dtype}")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self.directory, f"index.{self.dtype.name}.sqlite"),
+                check_same_thread=False,
+            )
+            with self._connection:
+                self._connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        model TEXT NOT NULL,
+                        hash TEXT NOT NULL,
+                        offset INTEGER NOT NULL,
+                        dimensions INTEGER NOT NULL,
+                        PRIMARY KEY (model, hash)
+                    )
+                    """
+                )
+        return self._connection
+
+    def _mapped_vectors(self, end: int) -> np.memmap:
+        # Map the file again once it has grown past the end of the current map:
+        if self._vectors is None or len(self._vectors) < end:
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r")
+        return self._vectors
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Returns the stored vectors of the hashes that are in the store, as float32."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay below SQLite's limit on the number of query parameters:
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start : start + 500]
+                rows = self.connection.execute(
+                    f"""
+                    SELECT hash, offset, dimensions FROM embeddings
+                    WHERE model = ? AND hash IN ({",".join("?" * len(batch))})
+                    """,
+                    (model, *batch),
+                ).fetchall()
+                if not rows:
+                    continue
+                vectors = self._mapped_vectors(max(o + d for _, o, d in rows))
+                for hash_, offset, dimensions in rows:
+                    found[hash_] = np.array(
+                        vectors[offset : offset + dimensions], dtype=np.float32
+                    )
+            self.hits += len(found)
+            self.misses += len(set(hashes)) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        with self._lock:
+            with open(self.vectors_path, "ab") as f:
+                offset = f.tell() // self.dtype.itemsize
+                rows = []
+                for hash_, vector in vectors.items():
+                    data = np.asarray(vector, dtype=self.dtype)
+                    f.write(data.tobytes())
+                    rows.append((model, hash_, offset, len(data)))
+                    offset += len(data)
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "bytes": os.path.getsize(self.vectors_path)
+            if os.path.exists(self.vectors_path)
+            else 0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors = None
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that are only computed for texts the store has not seen before.
+
+    Every text is looked up by the hash of its content, so the same chunk of a
+    page that was scraped for an earlier topic is not embedded again. The
+    missing texts are embedded in batches of batch_size. While the response
+    cache is in replay mode, a missing text raises ReplayCacheMiss instead.
+
+    Args:
+        embeddings: The backend that computes missing embeddings.
+        store: Where the embeddings are kept.
+        model_name: Part of the cache key, so that vectors of different
+            models never mix. Defaults to the model attribute of the backend,
+            with its dimensions if they were set.
+        batch_size: The number of texts per embedding call.
+        queries_as_documents: Whether the backend embeds a query exactly like
+            a document, so that embed_queries() can embed the missing queries
+            in batches. Otherwise each missing query gets its own call.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        store: EmbeddingStore,
+        model_name: Optional[str] = None,
+        batch_size: int = 256,
+        queries_as_documents: bool = False,
+    ):
+        self.embeddings = embeddings
+        self.store = store
+        if model_name is None:
+            model_name = str(
+                getattr(embeddings, "model", None)
+                or getattr(embeddings, "model_name", None)
+                or type(embeddings).__name__
+            )
+            # e.g. OpenAIEmbeddings can shorten the vectors of the same model:
+            dimensions = getattr(embeddings, "dimensions", None)
+            if dimensions is not None:
+                model_name = f"{model_name}:{dimensions}"
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.queries_as_documents = queries_as_documents
+
+    def _embed(
+        self,
+        model_name: str,
+        texts: List[str],
+        embed_batch: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.store.get_many(model_name, hashes)
+
+        # Embed each missing text once, even if it occurs several times:
+        missing = {h: text for h, text in zip(hashes, texts) if h not in vectors}
+        missing_hashes = list(missing)
+        if missing_hashes and is_replaying():
+            raise ReplayCacheMiss(f"No cached embeddings for {len(missing_hashes)} texts")
+        for start in range(0, len(missing_hashes), self.batch_size):
+            batch = missing_hashes[start : start + self.batch_size]
+            embedded = dict(zip(batch, embed_batch([missing[h] for h in batch])))
+            self.store.put_many(model_name, embedded)
+            vectors.update(
+                (h, np.asarray(vector, dtype=np.float32)) for h, vector in embedded.items()
+            )
+        return [vectors[h].tolist() for h in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(self.model_name, texts, self.embeddings.embed_documents)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embeds many queries, e.g. every subheading of an outline, in as few calls as possible."""
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            if self.queries_as_documents:
+                return self.embeddings.embed_documents(batch)
+            return [self.embeddings.embed_query(text) for text in batch]
+
+        # Some models embed queries differently from documents, so they are cached apart:
+        return self._embed(f"{self.model_name}:query", texts, embed_batch)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def create_embeddings(
+    backend: str = "openai",
+    model_name: Optional[str] = None,
+    cache_directory: Optional[str] = EMBEDDING_CACHE_DIRECTORY,
+    dtype: str = "float32",
+) -> Embeddings:
+    """
+    Creates the embeddings for retrieval, cached on disk unless cache_directory is None.
+
+    Args:
+        backend: "openai" for OpenAIEmbeddings, or "sentence-transformers" for a
+            local model that works offline.
+        model_name: The model of the backend. Defaults to the backend's default.
+        cache_directory: Where the EmbeddingStore keeps its files.
+        dtype: "float32", or "float16" to halve the size of the cache.
+    """
+    if backend == "openai":
+        from langchain_openai.embeddings import OpenAIEmbeddings
+
+        embeddings: Embeddings = (
+            OpenAIEmbeddings(model=model_name) if model_name else OpenAIEmbeddings()
+        )
+    elif backend == "sentence-transformers":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        embeddings = HuggingFaceEmbeddings(
+            model_name=model_name or "sentence-transformers/all-MiniLM-L6-v2",
+            encode_kwargs={"normalize_embeddings": True},
+        )
+    else:
+        raise ValueError("backend must be 'openai' or 'sentence-transformers'")
+
+    if cache_directory is None:
+        return embeddings
+    # Both backends embed a query with the same call as a document:
+    return CachedEmbeddings(
+        embeddings,
+        EmbeddingStore(cache_directory, dtype=dtype),
+        queries_as_documents=True,
+    )
+
+
+@lru_cache(maxsize=None)
+def default_embeddings() -> Embeddings:
+    """Returns the cached OpenAI embeddings shared by every ContentGenerator, created on first use."""
+    embeddings = create_embeddings()
+    atexit.register(embeddings.close)  # type: ignore
+    return embeddings
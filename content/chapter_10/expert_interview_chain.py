@@ -1,6 +1,6 @@
 # Standard libraries
 from pydantic.v1 import BaseModel, Field
-from typing import List, Any
+from typing import TYPE_CHECKING, List, Any, Optional
 
 # Langchain libraries
 from langchain_openai.chat_models import ChatOpenAI
@@ -12,6 +12,12 @@ from langchain_core.prompts import (
 )
 from langchain_core.runnables import RunnableParallel
 
+# Custom imports:
+from semantic_cache import describe_summaries
+
+if TYPE_CHECKING:
+    from semantic_cache import SemanticCache
+
 
 class Question(BaseModel):
     """Single Output - A question with no answer"""
@@ -29,10 +35,16 @@ class InterviewQuestions(BaseModel):
 
 
 class InterviewChain:
-    def __init__(self, topic: str, document_summaries: Any):
+    def __init__(
+        self,
+        topic: str,
+        document_summaries: Any,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
         self.topic = topic
         self.llm = ChatOpenAI(temperature=0)
         self.document_summaries = document_summaries
+        self.semantic_cache = semantic_cache
 
     def __call__(self) -> Any:
         # Create an LLM:
@@ -73,14 +85,24 @@ class InterviewChain:
             | model
         )
 
+        inputs = {
+            "topic": self.topic,
+            "document_summaries": self.document_summaries,
+            "format_instructions": parser.get_format_instructions(),
+        }
+
+        # Reuse the questions of a similar topic whose summaries share their key points:
+        if self.semantic_cache is not None:
+            description = describe_summaries(self.topic, self.document_summaries)
+            cached_questions = self.semantic_cache.lookup("interview", description)
+            if cached_questions is not None:
+                return cached_questions
+
         # Run the chat:
-        result = chain.invoke(
-            {
-                "topic": self.topic,
-                "document_summaries": self.document_summaries,
-                "format_instructions": parser.get_format_instructions(),
-            }
-        )
+        result = chain.invoke(inputs)
 
         # Parse the llm response::
-        return parser.parse(result.content)
+        interview_questions = parser.parse(result.content)
+        if self.semantic_cache is not None:
+            self.semantic_cache.update("interview", description, interview_questions)
+        return interview_questions
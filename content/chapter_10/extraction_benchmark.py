@@ -0,0 +1,70 @@
+"""
+Measures the speedup of converting large HTML pages to text in a process pool,
+compared with running Html2TextTransformer serially.
+
+Usage:
+    python extraction_benchmark.py --pages 64 --paragraphs 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_community.document_transformers import Html2TextTransformer
+from langchain_core.documents import Document
+
+from html_extraction import ahtml_to_text
+
+
+def build_corpus(num_pages: int, num_paragraphs: int):
+    documents = []
+    for page in range(num_pages):
+        paragraphs = "".join(
+            f"<h2>Section {i}</h2><p>Paragraph {i} of page {page} with a <a href='/link/{i}'>link</a>"
+            f" and <b>bold</b> text in a <ul><li>list</li><li>of items</li></ul></p>"
+            for i in range(num_paragraphs)
+        )
+        documents.append(
+            Document(
+                page_content=f"<html><body><h1>Page {page}</h1>{paragraphs}</body></html>",
+                metadata={"source": f"https://example.com/page-{page}"},
+            )
+        )
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=2)
+    args = parser.parse_args()
+
+    documents = build_corpus(args.pages, args.paragraphs)
+    size_mb = sum(len(d.page_content) for d in documents) / (1024 * 1024)
+    print(f"Converting {args.pages} pages ({size_mb:.1f} MB of HTML):\n")
+
+    start_time = time.perf_counter()
+    expected = Html2TextTransformer().transform_documents(documents)
+    serial_seconds = time.perf_counter() - start_time
+    print(f"{'serial':<12}{serial_seconds:>8.2f}s  speedup 1.00x")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Start the workers before timing, as the pool is meant to be reused:
+            list(executor.map(abs, range(workers)))
+            start_time = time.perf_counter()
+            results = asyncio.run(
+                ahtml_to_text(documents, executor=executor, chunk_size=args.chunk_size)
+            )
+            seconds = time.perf_counter() - start_time
+        assert [r.page_content for r in results] == [e.page_content for e in expected]
+        assert [r.metadata for r in results] == [d.metadata for d in documents]
+        print(f"{f'{workers} workers':<12}{seconds:>8.2f}s  speedup {serial_seconds / seconds:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
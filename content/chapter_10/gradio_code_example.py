@@ -1,5 +1,4 @@
 import asyncio
-from langchain_openai.chat_models import ChatOpenAI
 from langchain.output_parsers import PydanticOutputParser
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
@@ -8,16 +7,34 @@ import getpass
 import os
 
 # Custom imports:
-from content_collection import collect_serp_data_and_extract_text_from_webpages
-from custom_summarize_chain import create_all_summaries, DocumentSummary
+from custom_summarize_chain import DocumentSummary, create_summary_llm
+from embedding_cache import default_embeddings
 from expert_interview_chain import InterviewChain
 from article_outline_generation import BlogOutlineGenerator
 from article_generation import ContentGenerator
 from image_generation_chain import create_image
+from response_cache import enable_response_cache
+from scrape_cache import ScrapeCache
+from semantic_cache import SemanticCache
+from summary_pipeline import summarize_topic_streaming
 
 # Check if the SERPAPI_API_KEY environment variables are set:
 os.environ["SERPAPI_API_KEY"] = getpass.getpass("Enter your SERPAPI API key: ")
 
+# Reuse scraped pages and their extracted text across runs:
+scrape_cache = ScrapeCache()
+
+# Reuse LLM responses across runs. With LLM_CACHE_REPLAY=1 a run is served
+# entirely from the cache and fails on any prompt that was not cached before:
+response_cache = enable_response_cache(replay=os.getenv("LLM_CACHE_REPLAY") == "1")
+
+# Reuse interview questions and outlines across overlapping topics:
+semantic_cache = SemanticCache()
+
+# Reuse the embeddings of chunks that were already embedded for an earlier article,
+# cached under EMBEDDING_CACHE_DIR:
+embeddings = default_embeddings()
+
 
 def get_summary(topic):
     new_loop = asyncio.new_event_loop()
@@ -32,23 +49,24 @@ def get_summary(topic):
 
 
 async def async_get_summary(topic):
-    # Extract content from webpages into LangChain documents:
-    text_documents = await collect_serp_data_and_extract_text_from_webpages(topic=topic)
-
-    # Create summaries using LLM:
-    llm = ChatOpenAI(temperature=0)
+    # Create summaries using LLM, sharing one client and connection pool:
+    llm = create_summary_llm()
     text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
         chunk_size=7000
     )
     parser = PydanticOutputParser(pydantic_object=DocumentSummary)
 
-    # Create the summaries:
+    # Scrape, extract and summarize every webpage as soon as it arrives:
     print("Creating all of the summaries...\n---" "")
-    summaries = await create_all_summaries(text_documents, parser, llm, text_splitter)
+    text_documents, summaries = await summarize_topic_streaming(
+        topic, parser, llm, text_splitter, cache=scrape_cache
+    )
 
     # Create interview questions:
     print("Creating the interview questions...\n---" "")
-    interview_chain = InterviewChain(topic=topic, document_summaries=summaries)
+    interview_chain = InterviewChain(
+        topic=topic, document_summaries=summaries, semantic_cache=semantic_cache
+    )
     interview_questions = interview_chain()
 
     # Only extract the questions:
@@ -74,22 +92,16 @@ async def async_get_summary(topic):
     ]
 
 
-def generate_content(topic, summaries, text_documents):
-    new_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(new_loop)
-
+async def generate_content(topic, summaries, text_documents):
     # Parsing the stringified versions of the inputs:
     summaries = eval(summaries)
     text_documents = eval(text_documents)
 
-    try:
-        result = new_loop.run_until_complete(
-            async_generate_content(topic, text_documents, summaries)
-        )
-    finally:
-        new_loop.close()
-
-    return result
+    # Gradio updates the outputs on every yield, so the content fills in as it is written:
+    async for generated_text, generated_image in async_generate_content(
+        topic, text_documents, summaries
+    ):
+        yield generated_text, generated_image
 
 
 with gr.Blocks() as demo:
@@ -125,27 +137,52 @@ with gr.Blocks() as demo:
 
             # General Article Outline:
             blog_outline_generator = BlogOutlineGenerator(
-                topic=topic, questions_and_answers=questions_and_answers
+                topic=topic,
+                questions_and_answers=questions_and_answers,
+                semantic_cache=semantic_cache,
             )
             questions_and_answers = blog_outline_generator.questions_and_answers
-            outline_result = blog_outline_generator.generate_outline(summaries)
+            # This generator runs on Gradio's event loop, so blocking calls go to a thread:
+            outline_result = await asyncio.to_thread(
+                blog_outline_generator.generate_outline, summaries
+            )
 
             # Article Text Generation:
             content_gen = ContentGenerator(
                 topic=topic,
                 outline=outline_result,
                 questions_and_answers=questions_and_answers,
+                embeddings=embeddings,
             )
-            content_gen.split_and_vectorize_documents(text_documents)
-            generated_text = content_gen.generate_blog_post()
+            await asyncio.to_thread(
+                content_gen.split_and_vectorize_documents, text_documents
+            )
+            # The finished sections are joined once per section, not on every token:
+            sections = []
+            written_text = ""
+            current_section = ""
+            async for event in content_gen.astream_blog_post():
+                if event.kind == "token":
+                    current_section += event.text
+                    yield written_text + current_section, None
+                else:
+                    sections.append(event.text)
+                    written_text = "\n\n".join(sections) + "\n\n"
+                    current_section = ""
+            generated_text = "\n\n".join(sections)
 
             # Placeholder for image and prompt generation:
-            generated_image = create_image(title=outline_result.title)
+            generated_image = await asyncio.to_thread(
+                create_image, title=outline_result.title
+            )
             # Make this into a PIL image:
             import PIL.Image as Image
 
-            generated_image = Image.open(generated_image[0])
-            return generated_text, generated_image
+            generated_image = await asyncio.to_thread(Image.open, generated_image[0])
+            print(f"LLM response cache: {response_cache.stats()}")
+            print(f"Semantic cache: {semantic_cache.stats()}")
+            print(f"Embedding cache: {embeddings.store.stats()}")
+            yield generated_text, generated_image
 
     with gr.Row():
         summarize_btn.click(
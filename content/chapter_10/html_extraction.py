@@ -0,0 +1,76 @@
+import asyncio
+import atexit
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from langchain_community.document_transformers import Html2TextTransformer
+from langchain_core.documents import Document
+
+
+def html_to_text(documents: List[Document]) -> List[Document]:
+    """Converts a chunk of HTML documents to text. Runs inside the worker processes."""
+    return Html2TextTransformer().transform_documents(documents)
+
+
+@lru_cache(maxsize=None)
+def shared_executor() -> ProcessPoolExecutor:
+    """Returns the process pool shared by every extraction, started on first use and shut down at exit."""
+    executor = ProcessPoolExecutor()
+    atexit.register(executor.shutdown, wait=False, cancel_futures=True)
+    return executor
+
+
+async def aiter_html_to_text(
+    documents: List[Document],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 4,
+) -> AsyncIterator[Tuple[int, Document]]:
+    """
+    Converts HTML documents to text in a process pool, without blocking the event loop.
+
+    Documents are sent to the pool in chunks of chunk_size, and each converted
+    document is yielded as soon as its chunk finishes, together with its index
+    in documents. The metadata of every document is kept.
+
+    Args:
+        documents: The HTML documents to convert.
+        executor: The executor to run on. Defaults to shared_executor(), so
+            the worker processes are only started once.
+        chunk_size: The number of documents sent to a worker at a time.
+    """
+    if not documents:
+        return
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = shared_executor()
+
+    pending: Dict[asyncio.Future, int] = {}
+    try:
+        for start in range(0, len(documents), chunk_size):
+            future = loop.run_in_executor(
+                executor, html_to_text, documents[start : start + chunk_size]
+            )
+            pending[future] = start
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                start = pending.pop(future)
+                for offset, document in enumerate(future.result()):
+                    yield start + offset, document
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def ahtml_to_text(
+    documents: List[Document],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 4,
+) -> List[Document]:
+    """Converts HTML documents to text in a process pool and returns them in their original order."""
+    results: List[Optional[Document]] = [None] * len(documents)
+    async for index, document in aiter_html_to_text(documents, executor, chunk_size):
+        results[index] = document
+    return results  # type: ignore[return-value]
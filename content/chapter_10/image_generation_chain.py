@@ -1,4 +1,5 @@
 import base64
+import json
 from langchain_openai.chat_models import ChatOpenAI
 from langchain_core.messages import SystemMessage
 import getpass
@@ -6,6 +7,9 @@ import os
 import requests
 import uuid
 
+# Custom imports:
+from response_cache import get_response_cache
+
 engine_id = "stable-diffusion-xl-1024-v1-0"
 api_host = os.getenv("API_HOST", "https://api.stability.ai")
 api_key = getpass.getpass("Enter your Stability API key: ")
@@ -26,32 +30,41 @@ def create_image(title):
     ).content
 
     # 3. Generate the image:
-    response = requests.post(
-        f"{api_host}/v1/generation/{engine_id}/text-to-image",
-        timeout=60,
-        headers={
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        json={
-            "text_prompts": [
-                {
-                    "text": f"an illustration of {image_prompt} in the style of corporate memphis, white background, professional, clean lines, warm pastel colors"
-                }
-            ],
-            "cfg_scale": 7,
-            "height": 1024,
-            "width": 1024,
-            "samples": 1,
-            "steps": 30,
-        },
-    )
-
-    if response.status_code != 200:
-        raise Exception("Non-200 response: " + str(response.text))
-
-    data = response.json()
+    request = {
+        "text_prompts": [
+            {
+                "text": f"an illustration of {image_prompt} in the style of corporate memphis, white background, professional, clean lines, warm pastel colors"
+            }
+        ],
+        "cfg_scale": 7,
+        "height": 1024,
+        "width": 1024,
+        "samples": 1,
+        "steps": 30,
+    }
+
+    def generate_image() -> bytes:
+        response = requests.post(
+            f"{api_host}/v1/generation/{engine_id}/text-to-image",
+            timeout=60,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+            json=request,
+        )
+        if response.status_code != 200:
+            raise Exception("Non-200 response: " + str(response.text))
+        return response.content
+
+    # Reuse the image of an earlier run, and never call the API in replay mode:
+    cache = get_response_cache()
+    if cache is not None:
+        data = json.loads(cache.cached_call(f"stability:{engine_id}", request, generate_image))
+    else:
+        data = json.loads(generate_image())
+
     image_paths = []
 
     for i, image in enumerate(data["artifacts"]):
@@ -0,0 +1,163 @@
+import asyncio
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+# A Mersenne prime larger than any 32-bit shingle hash, as used by MinHash:
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def _choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Picks the number of LSH bands and rows whose S-curve crosses closest to the threshold."""
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Finds near-duplicate texts with MinHash signatures and an LSH index.
+
+    Each text is split into word shingles, summarized by a MinHash signature,
+    and the signature is cut into bands. Only texts that share a band bucket
+    are compared, so a lookup does not scan every text seen so far. A candidate
+    counts as a duplicate when the estimated Jaccard similarity of the shingles
+    is at least threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be between 0 and 1")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _choose_bands(threshold, num_perm)
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [
+            defaultdict(list) for _ in range(self.bands)
+        ]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self.checked = 0
+        self.duplicates = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {
+            " ".join(words[i : i + size]) for i in range(max(len(words) - size + 1, 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # Apply every permutation to every shingle hash at once, then keep the minimum:
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: Hashable, text: str) -> Optional[Hashable]:
+        """
+        Adds a text to the index, unless it is a near-duplicate of a text already in it.
+
+        Returns:
+            The key of the text that this one duplicates, or None if it was added.
+        """
+        self.checked += 1
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+
+        candidates = []
+        for buckets, band_key in zip(self._buckets, band_keys):
+            candidates.extend(buckets.get(band_key, ()))
+        for candidate in dict.fromkeys(candidates):
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                self.duplicates += 1
+                return candidate
+
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets[band_key].append(key)
+        return None
+
+
+class RankedNearDuplicateFilter:
+    """
+    Drops near-duplicates of higher-ranked texts that arrive in any order.
+
+    Each text is only checked once every higher-ranked text has been added or
+    skipped, so when the pages of a stream finish extraction out of order, the
+    highest-ranked copy is still the one that is kept. Must be created and used
+    inside a running event loop.
+    """
+
+    def __init__(self, count: int, threshold: float = 0.8):
+        self.index = NearDuplicateIndex(threshold=threshold)
+        self._settled = [asyncio.Event() for _ in range(count)]
+
+    def skip(self, rank: int) -> None:
+        """Marks a text that will never be added, e.g. a page that failed to load."""
+        self._settled[rank].set()
+
+    async def add(self, rank: int, text: str) -> Optional[int]:
+        """
+        Adds the text at a rank, unless it is a near-duplicate of a higher-ranked text.
+
+        Returns:
+            The rank of the text that this one duplicates, or None if it was added.
+        """
+        try:
+            for settled in self._settled[:rank]:
+                await settled.wait()
+            return self.index.add(rank, text)
+        finally:
+            self._settled[rank].set()
+
+
+def deduplicate_documents(
+    documents: List[Document], threshold: float = 0.8
+) -> List[Document]:
+    """
+    Drops documents that are near-duplicates of a higher-ranked document.
+
+    The documents keep their original order, and each one that is dropped saves
+    one summarization call.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    unique_documents = []
+    for position, document in enumerate(documents):
+        duplicate_of = index.add(position, document.page_content)
+        if duplicate_of is None:
+            unique_documents.append(document)
+        else:
+            print(
+                f"Dropping {document.metadata.get('source', position)}, a near-duplicate of "
+                f"{documents[duplicate_of].metadata.get('source', duplicate_of)}"
+            )
+    print(f"Near-duplicate removal saved {index.duplicates} LLM calls.")
+    return unique_documents
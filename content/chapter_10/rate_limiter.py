@@ -0,0 +1,202 @@
+import asyncio
+import random
+import time
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# A job is a coroutine function to call and the number of tokens it will use:
+Job = Tuple[Callable[[], Awaitable[T]], int]
+
+
+@lru_cache(maxsize=None)
+def _encoding_for_model(model_name: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_prompt_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
+    """Counts the tokens of a prompt with the tiktoken encoding of the model."""
+    return len(_encoding_for_model(model_name).encode(text, disallowed_special=()))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Returns True for HTTP 429 errors, such as openai.RateLimitError."""
+    return (
+        getattr(error, "status_code", None) == 429
+        or type(error).__name__ == "RateLimitError"
+    )
+
+
+class TokenBucket:
+    """
+    An async token bucket that refills at a constant rate up to its capacity.
+
+    Waiters are served in arrival order, so a large request is not starved by
+    a stream of small ones. A request for more than the capacity waits for a
+    full bucket instead of waiting forever.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        return cls(capacity=limit, refill_per_second=limit / 60)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.refill_per_second)
+
+
+class RateLimitedScheduler:
+    """
+    Runs LLM calls concurrently within requests-per-minute and tokens-per-minute limits.
+
+    Every call first takes one of max_in_flight slots, then one request and its
+    tokens from the two token buckets. Calls that fail with a rate limit error
+    are retried with jittered exponential backoff, and give back their slot
+    while they wait so that other calls can go ahead.
+
+    Args:
+        requests_per_minute: The request limit of the model.
+        tokens_per_minute: The token limit of the model.
+        max_in_flight: The maximum number of calls running at the same time.
+        max_retries: The number of retries before a rate limit error is raised.
+        base_delay: The backoff before the first retry, in seconds.
+        max_delay: The upper bound of the backoff, in seconds.
+        should_retry: Decides which exceptions are retried.
+        token_counter: Counts the tokens of a prompt.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 60_000,
+        max_in_flight: int = 10,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        should_retry: Callable[[Exception], bool] = is_rate_limit_error,
+        token_counter: Callable[[str], int] = count_prompt_tokens,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.should_retry = should_retry
+        self.token_counter = token_counter
+        self.requests = 0
+        self.retries = 0
+        # The buckets and semaphore are bound to the event loop that uses them:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_to_running_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._request_bucket = TokenBucket.per_minute(self.requests_per_minute)
+        self._token_bucket = TokenBucket.per_minute(self.tokens_per_minute)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+    def backoff(self, attempt: int) -> float:
+        """Returns a random delay up to the exponential backoff of the attempt ("full jitter")."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def call(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Calls fn once the limits allow it, retrying rate limit errors."""
+        self._bind_to_running_loop()
+        attempt = 0
+        while True:
+            async with self._in_flight:
+                await self._request_bucket.acquire(1)
+                await self._token_bucket.acquire(tokens)
+                self.requests += 1
+                try:
+                    return await fn()
+                except Exception as e:
+                    if attempt >= self.max_retries or not self.should_retry(e):
+                        raise
+            self.retries += 1
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def as_completed(
+        self, jobs: Iterable[Job], return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Runs the jobs and yields (index, result) pairs in completion order.
+
+        If return_exceptions is True, a failed job yields its exception as the
+        result. Otherwise the first failure is raised and the remaining jobs
+        are cancelled.
+        """
+        pending = {
+            asyncio.ensure_future(self.call(fn, tokens)): index
+            for index, (fn, tokens) in enumerate(jobs)
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is not None and return_exceptions:
+                        yield index, task.exception()
+                    else:
+                        yield index, task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run(
+        self,
+        jobs: Iterable[Job],
+        preserve_order: bool = False,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Runs the jobs and returns their results in completion order, or in job order if preserve_order is True."""
+        completed = [
+            entry async for entry in self.as_completed(jobs, return_exceptions)
+        ]
+        if preserve_order:
+            completed.sort(key=lambda entry: entry[0])
+        return [result for _, result in completed]
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from langchain.globals import get_llm_cache, set_llm_cache
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+
+class ReplayCacheMiss(LookupError):
+    """Raised in replay mode when a model call has no cached response."""
+
+
+def canonical_key(prompt: str, llm_string: str) -> str:
+    """
+    Hashes a prompt and model configuration into a cache key.
+
+    LangChain serializes the messages of a chat prompt as JSON, which is
+    re-encoded with sorted keys so that equal messages always share a key. The
+    llm_string holds the model name, temperature and the other call parameters,
+    and the output schema is part of the prompt through its format instructions.
+    """
+    try:
+        prompt = json.dumps(json.loads(prompt), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        # Completion models are prompted with plain text:
+        pass
+    return hashlib.sha256(f"{prompt}\0{llm_string}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache(BaseCache):
+    """
+    A persistent SQLite cache of LLM responses for every LangChain model call.
+
+    Responses older than ttl are never served, and the least recently used
+    responses are evicted once the cache grows beyond max_bytes. In replay
+    mode a cache miss raises ReplayCacheMiss instead of calling the model, so
+    a pipeline run can be repeated offline with exactly the same responses.
+    Calls that do not go through LangChain, such as image generation, are
+    cached with cached_call().
+    """
+
+    def __init__(
+        self,
+        path: str = "response_cache.sqlite",
+        ttl: Optional[float] = 30 * 24 * 60 * 60,
+        max_bytes: int = 200 * 1024 * 1024,
+        replay: bool = False,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at >= self.ttl
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = canonical_key(prompt, llm_string)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            # Expired responses are still replayed, as replay mode never calls the model:
+            if row is None or (self._is_expired(row[1]) and not self.replay):
+                self.misses += 1
+                if self.replay:
+                    raise ReplayCacheMiss(f"No cached response for the prompt {key}")
+                return None
+            self.hits += 1
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+        return loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._store(
+            canonical_key(prompt, llm_string),
+            zlib.compress(dumps(return_val).encode("utf-8")),
+        )
+
+    def _store(self, key: str, response: bytes) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, response, now, now, len(response)),
+            )
+            self._evict()
+
+    def cached_call(self, namespace: str, request: Any, fn: Callable[[], bytes]) -> bytes:
+        """
+        Returns the cached response to a JSON request, or calls fn and caches what it returns.
+
+        Like a model call, a miss raises ReplayCacheMiss in replay mode.
+        """
+        key = canonical_key(json.dumps(request, sort_keys=True), namespace)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (self.replay or not self._is_expired(row[1])):
+                self.hits += 1
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                    )
+                return zlib.decompress(row[0])
+            self.misses += 1
+        if self.replay:
+            raise ReplayCacheMiss(f"No cached {namespace} response for the request {key}")
+
+        response = fn()
+        self._store(key, zlib.compress(response))
+        return response
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def _evict(self) -> None:
+        if self.ttl is not None and not self.replay:
+            self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns the ResponseCache enabled with enable_response_cache(), if any."""
+    cache = get_llm_cache()
+    return cache if isinstance(cache, ResponseCache) else None
+
+
+def is_replaying() -> bool:
+    """Whether calls outside the response cache, e.g. for embeddings, must not go to the network."""
+    cache = get_response_cache()
+    return cache is not None and cache.replay
+
+
+def enable_response_cache(
+    path: str = "response_cache.sqlite",
+    ttl: Optional[float] = 30 * 24 * 60 * 60,
+    max_bytes: int = 200 * 1024 * 1024,
+    replay: bool = False,
+) -> ResponseCache:
+    """Caches the responses of every LangChain model call, see ResponseCache."""
+    cache = ResponseCache(path, ttl=ttl, max_bytes=max_bytes, replay=replay)
+    set_llm_cache(cache)
+    return cache
@@ -0,0 +1,196 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visitor came from:
+TRACKING_PARAMETERS = {"gclid", "fbclid", "msclkid", "ref"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that trivially different links share a cache entry.
+
+    The scheme and host are lower-cased, default ports, fragments and tracking
+    parameters are removed, and the remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in TRACKING_PARAMETERS and not key.startswith("utm_")
+        )
+    )
+    path = parts.path or "/"
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class CachedPage(NamedTuple):
+    url: str
+    html: str
+    text: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    is_fresh: bool
+
+
+class ScrapeCache:
+    """
+    A persistent SQLite cache of scraped HTML, extracted text and fetch metadata.
+
+    Entries are keyed by a hash of the normalized URL and stored compressed.
+    Entries older than ttl are stale: they are only reused after a conditional
+    request with their ETag or Last-Modified confirms that the page has not
+    changed. The least recently used entries are evicted once the cache grows
+    beyond max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str = "scrape_cache.sqlite",
+        ttl: float = 7 * 24 * 60 * 60,
+        max_bytes: int = 500 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    html BLOB NOT NULL,
+                    text BLOB,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)"
+            )
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Returns the cached page for a URL, whether it is fresh or stale."""
+        key = self.key(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT html, text, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+        html, text, etag, last_modified, fetched_at = row
+        return CachedPage(
+            url=url,
+            html=zlib.decompress(html).decode("utf-8"),
+            text=zlib.decompress(text).decode("utf-8") if text is not None else None,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=fetched_at,
+            is_fresh=time.time() - fetched_at < self.ttl,
+        )
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        text: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        html_blob = zlib.compress(html.encode("utf-8"))
+        text_blob = zlib.compress(text.encode("utf-8")) if text is not None else None
+        size = len(html_blob) + (len(text_blob) if text_blob is not None else 0)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                (key, url, html, text, etag, last_modified, fetched_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (self.key(url), url, html_blob, text_blob, etag, last_modified, now, now, size),
+            )
+            self._evict()
+
+    def put_text(self, url: str, text: str) -> None:
+        """Stores the extracted text for a page that is already cached."""
+        text_blob = zlib.compress(text.encode("utf-8"))
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE pages SET text = ?, size = length(html) + ? WHERE key = ?",
+                (text_blob, len(text_blob), self.key(url)),
+            )
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """Marks a stale page as fresh again, e.g. after a 304 Not Modified response."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, self.key(url)),
+            )
+
+    @staticmethod
+    def conditional_headers(page: CachedPage) -> Dict[str, str]:
+        """Returns the headers for a conditional refetch of a cached page."""
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def _evict(self) -> None:
+        # Stale pages that cannot be revalidated will never be served again:
+        self._connection.execute(
+            "DELETE FROM pages WHERE fetched_at < ? AND etag IS NULL AND last_modified IS NULL",
+            (time.time() - self.ttl,),
+        )
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM pages ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._connection.executemany("DELETE FROM pages WHERE key = ?", evicted)
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,64 @@
+"""
+Measures how many pages per second ChromiumLoader scrapes at different
+concurrency levels, against a local HTTP server that serves fixture pages
+with a simulated network delay.
+
+Usage:
+    python scraping_benchmark.py --pages 32 --delay 0.5 --concurrency 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from content_collection import ChromiumLoader
+
+
+def start_fixture_server(delay: float) -> ThreadingHTTPServer:
+    class FixturePageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            paragraphs = "".join(f"<p>Paragraph {i} of {self.path}</p>" for i in range(200))
+            body = f"<html><body><h1>{self.path}</h1>{paragraphs}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixturePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = start_fixture_server(args.delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base_url}/page-{i}" for i in range(args.pages)]
+
+    print(f"Scraping {args.pages} pages with a {args.delay}s server delay:\n")
+    for max_concurrency in args.concurrency:
+        loader = ChromiumLoader(urls, max_concurrency=max_concurrency)
+        start_time = time.perf_counter()
+        documents = asyncio.run(loader.load())
+        elapsed = time.perf_counter() - start_time
+        errors = sum(d.page_content.startswith("Error:") for d in documents)
+        print(
+            f"concurrency {max_concurrency:>3}: {len(documents) / elapsed:>7.2f} pages/s"
+            f"  ({elapsed:.2f}s, {errors} errors)"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measures the wall time of writing a blog post section by section, as
+generate_blog_post() does, against writing the sections concurrently with
+agenerate_blog_post().
+
+A local stub model answers every prompt after --latency seconds, so no request
+leaves the machine. Retrieval is skipped, as it is the same for both modes.
+
+Usage:
+    python section_generation_benchmark.py --sections 2 4 8 16 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, List
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from article_generation import ContentGenerator
+from article_outline_generation import BlogOutline, SubHeading
+
+
+class StubChatModel(BaseChatModel):
+    latency: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat-model"
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage]) -> int:
+        return sum(len(str(message.content).split()) for message in messages)
+
+    def _generate(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="## Section\nText."))]
+        )
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="## Section\nText."))]
+        )
+
+
+class BenchmarkContentGenerator(ContentGenerator):
+    def _retrieve_relevant_documents(self, subheading: Any) -> Any:
+        return ""
+
+
+def create_generator(num_sections: int, latency: float) -> ContentGenerator:
+    outline = BlogOutline(
+        title="Memetics",
+        sub_headings=[SubHeading(title=f"Section {i}") for i in range(num_sections)],
+    )
+    return BenchmarkContentGenerator(
+        topic="Memetics",
+        outline=outline,
+        questions_and_answers={},
+        text_splitter=RecursiveCharacterTextSplitter(),
+        llm=StubChatModel(latency=latency),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    # The embeddings client is never used, but it needs a key to be built:
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    print(
+        f"{'sections':>8}{'sequential s':>14}{'concurrent s':>14}{'+dedup s':>10}{'speedup':>9}"
+    )
+    for num_sections in args.sections:
+        # Silence the progress messages of the generator:
+        with redirect_stdout(StringIO()):
+            generator = create_generator(num_sections, args.latency)
+            start_time = time.perf_counter()
+            generator.generate_blog_post()
+            sequential_seconds = time.perf_counter() - start_time
+
+            generator = create_generator(num_sections, args.latency)
+            start_time = time.perf_counter()
+            asyncio.run(generator.agenerate_blog_post(args.max_concurrency))
+            concurrent_seconds = time.perf_counter() - start_time
+
+            generator = create_generator(num_sections, args.latency)
+            start_time = time.perf_counter()
+            asyncio.run(
+                generator.agenerate_blog_post(args.max_concurrency, deduplicate=True)
+            )
+            deduplicated_seconds = time.perf_counter() - start_time
+
+        print(
+            f"{num_sections:>8}{sequential_seconds:>14.2f}{concurrent_seconds:>14.2f}"
+            f"{deduplicated_seconds:>10.2f}{sequential_seconds / concurrent_seconds:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def exact_key(*parts: Any) -> str:
+    """
+    Hashes the parts of a prompt that must match exactly for a cache hit.
+
+    Use it in the namespace of a lookup, e.g. for the interview answers, and
+    embed only the parts whose meaning should match, see describe_summaries().
+    """
+    try:
+        serialized = json.dumps(parts, sort_keys=True, default=str)
+    except TypeError:
+        # e.g. a dict with keys that are not strings:
+        serialized = repr(parts)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def describe_summaries(
+    topic: str, summaries: Iterable[Any], key_points_per_summary: int = 3
+) -> str:
+    """
+    Returns the topic and the first key points of each summary, as a short text to embed.
+
+    Near-duplicate topics are summarized from different SERP pages, but those
+    still share most of their key points. The whole formatted prompt would be
+    truncated by the embedding model, at about 256 tokens for
+    all-MiniLM-L6-v2, and its fixed template text would dominate the similarity.
+    """
+    key_points: List[str] = []
+    for summary in summaries:
+        points = (
+            summary.get("key_points")
+            if isinstance(summary, dict)
+            else getattr(summary, "key_points", None)
+        )
+        key_points.extend((points or [])[:key_points_per_summary])
+    return "\n".join([topic, *key_points])
+
+
+def sentence_transformer_embedder(
+    model_name: str = "all-MiniLM-L6-v2",
+) -> Callable[[List[str]], np.ndarray]:
+    """Returns a function that embeds texts locally with a sentence-transformers model."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+
+    def embed(texts: List[str]) -> np.ndarray:
+        return model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+
+    return embed
+
+
+class SemanticCache:
+    """
+    Caches results by the meaning of their prompt, instead of its exact text.
+
+    Prompts are embedded into unit vectors and kept in a FAISS inner product
+    index, so the nearest cached prompt is found by cosine similarity. A
+    lookup hits when that similarity is at least threshold and the cached
+    result was stored under the same namespace, e.g. the same chain and the
+    exact_key() of its other inputs. At most
+    max_entries results are kept, and the least recently used one is evicted
+    first.
+
+    Args:
+        embed: Embeds a list of texts into an array of unit vectors. Defaults
+            to a local sentence-transformers model, which is loaded on first use.
+        threshold: The minimum cosine similarity of a hit.
+        max_entries: The maximum number of cached results.
+        neighbours: The number of nearest prompts checked for a matching namespace.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        neighbours: int = 4,
+    ):
+        self._embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.neighbours = neighbours
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self._index: Any = None
+        self._entries: "OrderedDict[int, Tuple[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        if self._embed is None:
+            self._embed = sentence_transformer_embedder()
+        vector = np.asarray(self._embed([text]), dtype=np.float32).reshape(1, -1)
+        # Normalize, so that the inner product is the cosine similarity:
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, namespace: str, prompt: str) -> Optional[Any]:
+        """Returns the result cached for the most similar prompt, or None."""
+        started = time.perf_counter()
+        vector = self.embed(prompt)
+        with self._lock:
+            result = self._search(namespace, vector)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.lookup_seconds += time.perf_counter() - started
+        return result
+
+    def _search(self, namespace: str, vector: np.ndarray) -> Optional[Any]:
+        if self._index is None or self._index.ntotal == 0:
+            return None
+        similarities, ids = self._index.search(
+            vector, min(self.neighbours, self._index.ntotal)
+        )
+        for similarity, entry_id in zip(similarities[0], ids[0]):
+            if similarity < self.threshold:
+                break
+            entry_namespace, result = self._entries[int(entry_id)]
+            if entry_namespace == namespace:
+                self._entries.move_to_end(int(entry_id))
+                return result
+        return None
+
+    def update(self, namespace: str, prompt: str, result: Any) -> None:
+        import faiss
+
+        vector = self.embed(prompt)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (namespace, result)
+
+            # Evict the least recently used results:
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted_id, _ = self._entries.popitem(last=False)
+                evicted.append(evicted_id)
+            if evicted:
+                self._index.remove_ids(np.array(evicted, dtype=np.int64))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_lookup_ms": 1000 * self.lookup_seconds / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Tells a stage worker that no more items will arrive:
+_DONE = object()
+
+
+class Stage:
+    """
+    A step of a StreamingPipeline.
+
+    fn is awaited once per item. Returning None drops the item, and raising an
+    exception records a failure for the item without stopping the pipeline.
+    At most concurrency items are processed at a time, and at most
+    max_queue_size items wait in front of the stage, which applies
+    backpressure to the stages before it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 1,
+        max_queue_size: Optional[int] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.name = name
+        self.fn = fn
+        self.concurrency = concurrency
+        self.max_queue_size = (
+            max_queue_size if max_queue_size is not None else 2 * concurrency
+        )
+
+
+class StageMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+        self.first_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+
+    @property
+    def mean_seconds(self) -> float:
+        calls = self.processed + self.dropped + self.failed
+        return self.busy_seconds / calls if calls else 0.0
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_started is None or self.last_finished is None:
+            return 0.0
+        return self.last_finished - self.first_started
+
+    def record(self, started: float, finished: float) -> None:
+        elapsed = finished - started
+        self.busy_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        if self.first_started is None or started < self.first_started:
+            self.first_started = started
+        if self.last_finished is None or finished > self.last_finished:
+            self.last_finished = finished
+
+
+class StreamingPipeline:
+    """
+    Runs items through a sequence of async stages connected by bounded queues.
+
+    Each item moves on to the next stage as soon as the previous stage has
+    finished with it, so a slow item only delays itself instead of holding up
+    every other item at each stage.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.metrics: Dict[str, StageMetrics] = {}
+        self.errors: Dict[int, Exception] = {}
+        self.wall_seconds = 0.0
+
+    async def _feed(self, items: Iterable[Any], queue: asyncio.Queue) -> None:
+        try:
+            for index, item in enumerate(items):
+                await queue.put((index, item))
+        except Exception:
+            # Still stop the first stage, so stream() finishes and raises the error:
+            await self._stop_workers(queue, self.stages[0].concurrency)
+            raise
+        await self._stop_workers(queue, self.stages[0].concurrency)
+
+    @staticmethod
+    async def _stop_workers(queue: asyncio.Queue, workers: int) -> None:
+        for _ in range(workers):
+            await queue.put(_DONE)
+
+    async def _worker(
+        self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue
+    ) -> None:
+        metrics = self.metrics[stage.name]
+        while True:
+            entry = await inbox.get()
+            if entry is _DONE:
+                return
+            index, item = entry
+            started = time.perf_counter()
+            try:
+                result = await stage.fn(item)
+            except Exception as e:
+                metrics.failed += 1
+                self.errors[index] = e
+                continue
+            finally:
+                metrics.record(started, time.perf_counter())
+            if result is None:
+                metrics.dropped += 1
+                continue
+            metrics.processed += 1
+            await outbox.put((index, result))
+
+    async def _run_stage(
+        self, position: int, inbox: asyncio.Queue, outbox: asyncio.Queue
+    ) -> None:
+        stage = self.stages[position]
+        await asyncio.gather(
+            *[self._worker(stage, inbox, outbox) for _ in range(stage.concurrency)]
+        )
+        # Tell every worker of the next stage, or the consumer, that this stage is done:
+        is_last = position == len(self.stages) - 1
+        next_workers = 1 if is_last else self.stages[position + 1].concurrency
+        await self._stop_workers(outbox, next_workers)
+
+    async def stream(self, items: Iterable[Any]) -> AsyncIterator[Tuple[int, Any]]:
+        """Yields (index, result) pairs in completion order as items leave the last stage."""
+        self.metrics = {stage.name: StageMetrics(stage.name) for stage in self.stages}
+        self.errors = {}
+        started = time.perf_counter()
+
+        queues = [asyncio.Queue(maxsize=stage.max_queue_size) for stage in self.stages]
+        # The results are collected by the consumer, so the last queue is unbounded:
+        queues.append(asyncio.Queue())
+        tasks = [asyncio.ensure_future(self._feed(items, queues[0]))] + [
+            asyncio.ensure_future(self._run_stage(i, queues[i], queues[i + 1]))
+            for i in range(len(self.stages))
+        ]
+        try:
+            while True:
+                entry = await queues[-1].get()
+                if entry is _DONE:
+                    break
+                yield entry
+            # Surface any error from feeding the items:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.wall_seconds = time.perf_counter() - started
+
+    async def run(self, items: Iterable[Any]) -> List[Optional[Any]]:
+        """Returns the results in input order, with None for dropped or failed items."""
+        items = list(items)
+        results: List[Optional[Any]] = [None] * len(items)
+        async for index, result in self.stream(items):
+            results[index] = result
+        return results
+
+    def report(self) -> str:
+        lines = [
+            f"{'stage':<14}{'done':>6}{'dropped':>9}{'failed':>8}{'mean s':>9}{'max s':>9}{'wall s':>9}"
+        ]
+        for m in self.metrics.values():
+            lines.append(
+                f"{m.name:<14}{m.processed:>6}{m.dropped:>9}{m.failed:>8}"
+                f"{m.mean_seconds:>9.2f}{m.max_seconds:>9.2f}{m.wall_seconds:>9.2f}"
+            )
+        lines.append(f"Total wall time: {self.wall_seconds:.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,154 @@
+"""
+Measures the per-document overhead of summarizing with a DocumentSummarizer that
+is built once, compared with building the model client and chain for every
+document as create_summary_from_text() used to.
+
+A local stub model answers every prompt, so no request leaves the machine and
+the timings only contain the LangChain and client overhead, plus --latency.
+
+Usage:
+    python summarization_benchmark.py --documents 200 --latency 0.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, List, Optional
+
+from langchain.chains import LLMChain
+from langchain.chains.combine_documents.stuff import StuffDocumentsChain
+from langchain.output_parsers import PydanticOutputParser
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import PromptTemplate
+from langchain_openai.chat_models import ChatOpenAI
+
+from custom_summarize_chain import (
+    SUMMARY_PROMPT_TEMPLATE,
+    DocumentSummarizer,
+    DocumentSummary,
+)
+
+STUB_SUMMARY = json.dumps(
+    {
+        "concise_summary": "A summary.",
+        "writing_style": "Informative",
+        "key_points": ["A key point."],
+        "expert_opinions": [],
+    }
+)
+
+
+class StubChatModel(BaseChatModel):
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat-model"
+
+    def _generate(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=STUB_SUMMARY))]
+        )
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=STUB_SUMMARY))]
+        )
+
+
+async def rebuild_per_document(
+    document: Document,
+    parser: PydanticOutputParser,
+    llm: BaseChatModel,
+    text_splitter: RecursiveCharacterTextSplitter,
+) -> Optional[DocumentSummary]:
+    # The objects the old create_summary_from_text() built on every call:
+    split_docs = text_splitter.split_documents([document])
+    ChatOpenAI(temperature=0, model="gpt-3.5-turbo-16k")
+    llm_chain = LLMChain(
+        llm=llm, prompt=PromptTemplate.from_template(SUMMARY_PROMPT_TEMPLATE)
+    )
+    stuff_chain = StuffDocumentsChain(
+        llm_chain=llm_chain, document_variable_name="text"
+    )
+    summary_result = await stuff_chain.ainvoke(
+        {
+            "input_documents": [split_docs[0]],
+            "format_instructions": parser.get_format_instructions(),
+        }
+    )
+    document_summary = parser.parse(summary_result["output_text"])
+    document_summary.metadata = document.metadata
+    return document_summary
+
+
+async def run_rebuilt(documents, parser, llm, text_splitter):
+    return await asyncio.gather(
+        *[rebuild_per_document(d, parser, llm, text_splitter) for d in documents]
+    )
+
+
+async def run_summarizer(documents, parser, llm, text_splitter):
+    summarizer = DocumentSummarizer(parser, text_splitter, llm)
+    return await asyncio.gather(*[summarizer.asummarize(d) for d in documents])
+
+
+async def run_abatch(documents, parser, llm, text_splitter):
+    summarizer = DocumentSummarizer(parser, text_splitter, llm)
+    return await summarizer.abatch(documents)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # The legacy client is never used to send a request, but it needs a key to be built:
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    documents = [
+        Document(
+            page_content=f"Paragraph {i} about memetics. " * 50,
+            metadata={"source": f"https://example.com/{i}"},
+        )
+        for i in range(args.documents)
+    ]
+    output_parser = PydanticOutputParser(pydantic_object=DocumentSummary)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=2000)
+    llm = StubChatModel(latency=args.latency)
+
+    print(f"Summarizing {args.documents} documents with a stub model:\n")
+    baseline = None
+    for name, run in [
+        ("rebuilt", run_rebuilt),
+        ("summarizer", run_summarizer),
+        ("abatch", run_abatch),
+    ]:
+        start_time = time.perf_counter()
+        # Silence the progress messages of the summarizer:
+        with redirect_stdout(StringIO()):
+            summaries = asyncio.run(run(documents, output_parser, llm, text_splitter))
+        seconds = time.perf_counter() - start_time
+        assert len(summaries) == args.documents and all(summaries)
+        baseline = baseline or seconds
+        print(
+            f"{name:<12}{seconds:>8.2f}s  {1000 * seconds / args.documents:>7.2f} ms/document"
+            f"  speedup {baseline / seconds:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
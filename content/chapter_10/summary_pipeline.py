@@ -0,0 +1,153 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from langchain.output_parsers import PydanticOutputParser
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from langchain_openai.chat_models import ChatOpenAI
+
+# Custom imports:
+from content_collection import (
+    ChromiumLoader,
+    cache_extracted_text,
+    cache_scraped_page,
+    get_urls_from_serp_results,
+    load_cached_page,
+    reuse_extracted_text,
+    search_serp_results,
+)
+from custom_summarize_chain import DocumentSummarizer, DocumentSummary
+from html_extraction import html_to_text, shared_executor
+from near_duplicates import RankedNearDuplicateFilter
+from scrape_cache import ScrapeCache
+from streaming_pipeline import Stage, StreamingPipeline
+
+
+async def summarize_topic_streaming(
+    topic: str,
+    parser: PydanticOutputParser,
+    llm: ChatOpenAI,
+    text_splitter: RecursiveCharacterTextSplitter,
+    cache: Optional[ScrapeCache] = None,
+    number_of_urls: int = 3,
+    scrape_concurrency: int = 5,
+    extract_concurrency: int = 4,
+    summarize_concurrency: int = 5,
+    executor: Optional[Executor] = None,
+    near_duplicate_threshold: Optional[float] = 0.8,
+) -> Tuple[List[Document], List[DocumentSummary]]:
+    """
+    Scrapes, extracts and summarizes the SERP results for a topic as a stream.
+
+    Unlike collect_serp_data_and_extract_text_from_webpages() followed by
+    create_all_summaries(), each page moves on to text extraction and then to
+    summarization as soon as it has been scraped, so the total wall time is
+    close to the slowest single page instead of the sum of the slowest page at
+    every stage. Pages that fail to load are dropped before they reach the LLM,
+    and so are near-duplicates of a higher-ranked page, whichever finishes first.
+
+    Returns:
+        The text documents and their summaries, in SERP order.
+    """
+    urls = get_urls_from_serp_results(search_serp_results(topic), number_of_urls)
+    summarizer = DocumentSummarizer(parser, text_splitter, llm)
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = shared_executor()
+
+    async with ChromiumLoader(urls, max_concurrency=scrape_concurrency) as loader:
+
+        # Every item carries its SERP rank, so near-duplicates are resolved by rank:
+        async def scrape(item: Tuple[int, str]) -> Optional[Tuple[int, Document]]:
+            rank, url = item
+            if cache is not None:
+                document = await load_cached_page(url, cache)
+                if document is not None:
+                    return rank, document
+
+            document = await loader.ascrape_document(url)
+            if document.page_content.startswith("Error:"):
+                print(f"Skipping {url}: {document.page_content}")
+                return None
+            if cache is not None:
+                cache_scraped_page(cache, document)
+            return rank, document
+
+        async def extract(item: Tuple[int, Document]) -> Tuple[int, Document]:
+            rank, document = item
+            reused = reuse_extracted_text([document])
+            if reused:
+                return rank, reused[0]
+            [text_document] = await loop.run_in_executor(executor, html_to_text, [document])
+            cache_extracted_text(cache, document, text_document)
+            return rank, text_document
+
+        async def deduplicate(
+            item: Tuple[int, Document],
+        ) -> Optional[Tuple[int, Document]]:
+            rank, text_document = item
+            duplicate_of = await near_duplicates.add(rank, text_document.page_content)
+            if duplicate_of is not None:
+                print(
+                    f"Dropping {text_document.metadata['source']}, "
+                    f"a near-duplicate of {urls[duplicate_of]}"
+                )
+                return None
+            return item
+
+        async def summarize(
+            item: Tuple[int, Document],
+        ) -> Optional[Tuple[Document, DocumentSummary]]:
+            _, text_document = item
+            summary = await summarizer.asummarize(text_document)
+            return None if summary is None else (text_document, summary)
+
+        def skip_when_dropped(
+            fn: Callable[[Any], Awaitable[Any]]
+        ) -> Callable[[Any], Awaitable[Any]]:
+            # A page that never reaches deduplication must not hold up the lower-ranked pages:
+            async def wrapper(item: Tuple[int, Any]) -> Any:
+                try:
+                    result = await fn(item)
+                except Exception:
+                    near_duplicates.skip(item[0])
+                    raise
+                if result is None:
+                    near_duplicates.skip(item[0])
+                return result
+
+            return wrapper
+
+        if near_duplicate_threshold is None:
+            stages = [
+                Stage("scrape", scrape, concurrency=scrape_concurrency),
+                Stage("extract", extract, concurrency=extract_concurrency),
+            ]
+        else:
+            # Pages finish extraction out of order, so each one waits for the higher-ranked
+            # pages, and the highest-ranked copy is kept. One worker per page avoids a deadlock:
+            near_duplicates = RankedNearDuplicateFilter(
+                len(urls), threshold=near_duplicate_threshold
+            )
+            stages = [
+                Stage("scrape", skip_when_dropped(scrape), concurrency=scrape_concurrency),
+                Stage("extract", skip_when_dropped(extract), concurrency=extract_concurrency),
+                Stage("deduplicate", deduplicate, concurrency=max(len(urls), 1)),
+            ]
+        stages.append(Stage("summarize", summarize, concurrency=summarize_concurrency))
+        pipeline = StreamingPipeline(stages)
+        results = await pipeline.run(enumerate(urls))
+
+    print(pipeline.report())
+    if near_duplicate_threshold is not None:
+        print(f"Near-duplicate removal saved {near_duplicates.index.duplicates} LLM calls.")
+    for index, error in pipeline.errors.items():
+        print(f"Failed to process {urls[index]}: {error}")
+
+    completed = [result for result in results if result is not None]
+    if len(completed) == 0:
+        raise ValueError("No summaries were created!")
+    text_documents = [text_document for text_document, _ in completed]
+    summaries = [summary for _, summary in completed]
+    return text_documents, summaries
@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Callable, Deque, Iterable
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+
+
+class TokenLedger:
+    """
+    Keeps a running token total for a growing list of chat messages.
+
+    Each message is counted once when it is appended, and the total is updated
+    in O(1) when messages are appended or pruned from the front, so the whole
+    buffer never has to be re-tokenized.
+    """
+
+    def __init__(
+        self, count_message: Callable[[BaseMessage], int], base_tokens: int = 0
+    ):
+        self.count_message = count_message
+        # Tokens that are added once per request, e.g. the reply priming tokens:
+        self.base_tokens = base_tokens
+        self._counts: Deque[int] = deque()
+        self._message_tokens = 0
+
+    @classmethod
+    def from_llm(cls, llm: BaseLanguageModel) -> "TokenLedger":
+        # get_num_tokens_from_messages() adds a constant overhead to every call,
+        # so measure it once and only count the messages themselves afterwards:
+        base_tokens = llm.get_num_tokens_from_messages([])
+        return cls(
+            lambda message: llm.get_num_tokens_from_messages([message]) - base_tokens,
+            base_tokens=base_tokens,
+        )
+
+    @property
+    def total(self) -> int:
+        return self._message_tokens + self.base_tokens
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def append(self, message: BaseMessage) -> int:
+        count = self.count_message(message)
+        self._counts.append(count)
+        self._message_tokens += count
+        return count
+
+    def extend(self, messages: Iterable[BaseMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def popleft(self) -> int:
+        count = self._counts.popleft()
+        self._message_tokens -= count
+        return count
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._message_tokens = 0
@@ -0,0 +1,221 @@
+import uuid
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Below this many vectors per IVF list, k-means has too little data to train on:
+MIN_VECTORS_PER_LIST = 39
+EMBEDDING_BATCH_SIZE = 1000
+
+
+def normalize(vectors: Any) -> np.ndarray:
+    """Returns the vectors as a float32 matrix of unit rows, so inner products are cosine similarities."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    An in-process vector store that keeps the embeddings in a single float32 matrix.
+
+    With backend="numpy", a search multiplies the normalized queries with the
+    whole matrix and picks the top k with argpartition. This is exact and, for
+    the few hundred chunks of an article, faster than starting a database. For
+    bigger corpora, backend="flat" searches a FAISS IndexFlatIP and
+    backend="ivf" a FAISS IndexIVFFlat, which only scans the nprobe nearest
+    of nlist clusters. The FAISS index is built on the first search after
+    texts were added.
+
+    As a LangChain VectorStore it can be used wherever Chroma is, e.g. through
+    as_retriever().
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        backend: str = "numpy",
+        nlist: int = 100,
+        nprobe: int = 8,
+    ):
+        if backend not in ("numpy", "flat", "ivf"):
+            raise ValueError("backend must be 'numpy', 'flat' or 'ivf'")
+        self._embedding = embedding
+        self.backend = backend
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._blocks: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._faiss_index: Any = None
+        self._documents: List[Document] = []
+        self._ids: List[str] = []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        # Embed in batches, so only one batch of embeddings is held as Python floats at a time:
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            end = start + EMBEDDING_BATCH_SIZE
+            self.add_vectors(
+                self._embedding.embed_documents(texts[start:end]),
+                texts[start:end],
+                metadatas[start:end],
+                ids[start:end],
+            )
+        return ids
+
+    def add_vectors(
+        self,
+        vectors: Any,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Adds texts whose embeddings were already computed."""
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        self._blocks.append(normalize(vectors))
+        self._documents.extend(
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(texts, metadatas)
+        )
+        self._ids.extend(ids)
+        # Rebuild the matrix and the FAISS index lazily, on the next search:
+        self._matrix = None
+        self._faiss_index = None
+        return ids
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        backend: str = "numpy",
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding, backend=backend, **kwargs)
+        store.add_texts(texts, metadatas, ids)
+        return store
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            if len(self._blocks) > 1:
+                self._blocks = [np.concatenate(self._blocks)]
+            self._matrix = (
+                self._blocks[0] if self._blocks else np.zeros((0, 0), np.float32)
+            )
+        return self._matrix
+
+    def _build_faiss_index(self) -> Any:
+        import faiss
+
+        matrix = self.matrix
+        dimensions = matrix.shape[1]
+        nlist = min(self.nlist, len(matrix) // MIN_VECTORS_PER_LIST)
+        if self.backend == "ivf" and nlist > 1:
+            quantizer = faiss.IndexFlatIP(dimensions)
+            index = faiss.IndexIVFFlat(
+                quantizer, dimensions, nlist, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(matrix)
+            index.nprobe = min(self.nprobe, nlist)
+        else:
+            # Too few vectors for clustering, so an exact search is used instead:
+            index = faiss.IndexFlatIP(dimensions)
+        index.add(matrix)
+        return index
+
+    def search(self, queries: Any, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest rows for every query vector.
+
+        Returns:
+            The cosine similarities and the row indices, both of shape
+            (number of queries, k), best first. k is capped at the number of rows.
+        """
+        queries = normalize(queries)
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        if self.backend != "numpy":
+            if self._faiss_index is None:
+                self._faiss_index = self._build_faiss_index()
+            return self._faiss_index.search(queries, k)
+
+        similarities = queries @ self.matrix.T
+        if k < similarities.shape[1]:
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(similarities.shape[1]), (len(queries), 1))
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1)
+        return (
+            np.take_along_axis(top_similarities, order, axis=1),
+            np.take_along_axis(top, order, axis=1),
+        )
+
+    def similarity_search_by_vectors(
+        self, embeddings: Any, k: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """Runs one search for many query embeddings, e.g. one per outline subheading."""
+        similarities, indices = self.search(embeddings, k)
+        return [
+            [
+                (self._documents[i], float(similarity))
+                for similarity, i in zip(row_similarities, row_indices)
+                # FAISS pads missing results with -1:
+                if i >= 0
+            ]
+            for row_similarities, row_indices in zip(similarities, indices)
+        ]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vectors(
+            [self._embedding.embed_query(query)], k
+        )[0]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [
+            document
+            for document, _ in self.similarity_search_by_vectors([embedding], k)[0]
+        ]
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [
+            document for document, _ in self.similarity_search_with_score(query, k)
+        ]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Map the cosine similarity from [-1, 1] to a relevance score in [0, 1]:
+        return lambda similarity: (similarity + 1) / 2
@@ -0,0 +1,126 @@
+"""
+Compares the build time, query latency and peak memory of the NumpyVectorStore
+backends with Chroma, for growing numbers of chunks.
+
+Usage:
+    python vector_index_benchmark.py --chunks 1000 10000 100000 --dimensions 1536
+
+The embeddings are random vectors computed up front and handed out through the
+Embeddings interface, so the build time includes converting them from Python
+lists, as it would for real embeddings. The peak RSS includes the random
+vectors themselves, which are the same for every backend. Each backend and
+size runs in its own subprocess, so the peak RSS of one run does not leak into
+the next. Chroma is skipped if it is not installed.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from vector_index import NumpyVectorStore
+
+BACKENDS = ["numpy", "flat", "ivf", "chroma"]
+NUM_QUERIES = 100
+K = 5
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux:
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Looks up the random vector of each text, which is named after its row."""
+
+    def __init__(self, vectors: np.ndarray, queries: np.ndarray):
+        self.vectors = vectors
+        self.queries = queries
+
+    def _lookup(self, text: str) -> List[float]:
+        kind, row = text.split()
+        return (self.vectors if kind == "chunk" else self.queries)[int(row)].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._lookup(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._lookup(text)
+
+
+def run_single(backend: str, num_chunks: int, dimensions: int) -> None:
+    generator = np.random.RandomState(0)
+    vectors = generator.standard_normal((num_chunks, dimensions)).astype(np.float32)
+    queries = generator.standard_normal((NUM_QUERIES, dimensions)).astype(np.float32)
+    embeddings = PrecomputedEmbeddings(vectors, queries)
+    texts = [f"chunk {i}" for i in range(num_chunks)]
+
+    start_time = time.perf_counter()
+    if backend == "chroma":
+        from langchain_community.vectorstores.chroma import Chroma
+
+        store = Chroma(embedding_function=embeddings)
+        # Chroma limits the number of texts per call:
+        for start in range(0, num_chunks, 5000):
+            store.add_texts(texts[start : start + 5000])
+    else:
+        store = NumpyVectorStore.from_texts(texts, embeddings, backend=backend)
+        # Build the FAISS index now, so it counts towards the build time:
+        store.search(queries[:1], K)
+    build_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for i in range(NUM_QUERIES):
+        store.similarity_search(f"query {i}", k=K)
+    query_ms = 1000 * (time.perf_counter() - start_time) / NUM_QUERIES
+    print(f"{build_seconds} {query_ms} {_peak_rss_mb()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--run", nargs=3, metavar=("BACKEND", "CHUNKS", "DIMENSIONS"))
+    args = parser.parse_args()
+
+    if args.run:
+        backend, num_chunks, dimensions = args.run
+        run_single(backend, int(num_chunks), int(dimensions))
+        return
+
+    print(
+        f"{'backend':<10}{'chunks':>10}{'build s':>10}{'query ms':>10}{'peak RSS MB':>14}"
+    )
+    for num_chunks in args.chunks:
+        for backend in args.backends:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--run",
+                    backend,
+                    str(num_chunks),
+                    str(args.dimensions),
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                error = result.stderr.strip().splitlines()[-1]
+                print(f"{backend:<10}{num_chunks:>10}  skipped: {error}")
+                continue
+            build_seconds, query_ms, peak_mb = result.stdout.split()
+            print(
+                f"{backend:<10}{num_chunks:>10}{float(build_seconds):>10.2f}"
+                f"{float(query_ms):>10.2f}{float(peak_mb):>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compares peak memory and throughput of the list-comprehension chunkers with
+the streaming, memory-mapped chunkers in streaming_chunking.py.
+
+Usage:
+    python chunking_benchmark.py --size-mb 200
+
+Each approach runs in its own subprocess, so the peak RSS of one approach
+does not leak into the measurement of the next.
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from streaming_chunking import (
+    iter_chunk_offsets,
+    iter_sliding_window_offsets,
+    mapped_text_file,
+)
+
+CHUNK_SIZE = 200
+WINDOW_SIZE = 200
+STEP_SIZE = 50
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux:
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_list_chunking(path: str) -> int:
+    # The same code as character_chunking_hubspot_blog_post.py:
+    with open(path, "r") as f:
+        text = f.read()
+    chunks = [text[i : i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+    return len(chunks)
+
+
+def _run_list_sliding_window(path: str) -> int:
+    with contextlib.redirect_stdout(io.StringIO()):
+        from sliding_window import sliding_window
+
+    with open(path, "r") as f:
+        text = f.read()
+    return len(sliding_window(text, WINDOW_SIZE, STEP_SIZE))
+
+
+def _run_mmap_chunking(path: str) -> int:
+    with mapped_text_file(path) as buffer:
+        return sum(1 for _ in iter_chunk_offsets(buffer, CHUNK_SIZE))
+
+
+def _run_mmap_sliding_window(path: str) -> int:
+    with mapped_text_file(path) as buffer:
+        return sum(
+            1 for _ in iter_sliding_window_offsets(buffer, WINDOW_SIZE, STEP_SIZE)
+        )
+
+
+APPROACHES = {
+    "list_chunking": _run_list_chunking,
+    "mmap_chunking": _run_mmap_chunking,
+    "list_sliding_window": _run_list_sliding_window,
+    "mmap_sliding_window": _run_mmap_sliding_window,
+}
+
+
+def build_corpus(path: str, size_mb: int) -> None:
+    """Writes a corpus of roughly size_mb megabytes by repeating the HubSpot blog post."""
+    sample_path = os.path.join(os.path.dirname(__file__), "hubspot_blog_post.txt")
+    with open(sample_path, "rb") as f:
+        sample = f.read()
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(sample)
+            written += len(sample)
+
+
+def run_single(approach: str, path: str) -> None:
+    start_time = time.perf_counter()
+    count = APPROACHES[approach](path)
+    elapsed = time.perf_counter() - start_time
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"{count} {elapsed} {size_mb / elapsed} {_peak_rss_mb()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--run", nargs=2, metavar=("APPROACH", "PATH"))
+    args = parser.parse_args()
+
+    if args.run:
+        run_single(*args.run)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.txt")
+        build_corpus(path, args.size_mb)
+        print(f"Corpus size: {os.path.getsize(path) / (1024 * 1024):.1f} MB\n")
+        print(f"{'approach':<22}{'chunks':>12}{'seconds':>10}{'MB/s':>10}{'peak RSS MB':>14}")
+        for approach in APPROACHES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", approach, path],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            count, elapsed, throughput, peak = output
+            print(
+                f"{approach:<22}{int(count):>12}{float(elapsed):>10.2f}"
+                f"{float(throughput):>10.1f}{float(peak):>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
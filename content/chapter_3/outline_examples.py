@@ -0,0 +1,26 @@
+"""
+The example outline of one_hierarchical_list_generation.py and the outline it
+should parse into, shared by the outline tests and outline_parsing_benchmark.py.
+"""
+import contextlib
+import io
+
+# Import the example outline without printing it:
+with contextlib.redirect_stdout(io.StringIO()):
+    from content.chapter_3.one_hierarchical_list_generation import openai_result
+
+# The outline every approach must produce from openai_result:
+EXPECTED_OUTLINE = {
+    "Introduction": [
+        "Explanation of data engineering",
+        "Importance of data engineering in today’s data-driven world",
+    ],
+    "Efficient Data Management": [
+        "Definition of data management",
+        "How data engineering helps in efficient data management.",
+    ],
+    "Conclusion": [
+        "Importance of Data Engineering in the modern business world",
+        "Future of Data Engineering and its impact on the data ecosystem",
+    ],
+}
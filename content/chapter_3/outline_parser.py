@@ -0,0 +1,95 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# A single precompiled pattern that matches either a heading or a subheading line.
+# The first group is "*" for headings and empty for subheadings:
+OUTLINE_LINE_PATTERN = re.compile(r"^[ \t]*(?:(\*)|[a-z]\.)[ \t]+([^\n]+)", re.MULTILINE)
+
+# (heading, None) when a heading starts, (heading, subheading) for each subheading:
+OutlineEvent = Tuple[str, Optional[str]]
+
+
+class OutlineParser:
+    """
+    Builds a heading -> subheadings outline from LLM output in a single linear scan.
+
+    Text can be passed in all at once with parse(), or chunk by chunk with
+    feed() while a completion is still streaming. Subheadings always stay
+    attached to the heading that precedes them.
+    """
+
+    def __init__(self):
+        self.outline: Dict[str, List[str]] = {}
+        self._current_heading: Optional[str] = None
+        self._pending = ""
+
+    def _scan(self, text: str) -> List[OutlineEvent]:
+        events: List[OutlineEvent] = []
+        for marker, title in OUTLINE_LINE_PATTERN.findall(text):
+            title = title.rstrip()
+            if marker:
+                self._current_heading = title
+                self.outline.setdefault(title, [])
+                events.append((title, None))
+            elif self._current_heading is not None:
+                self.outline[self._current_heading].append(title)
+                events.append((self._current_heading, title))
+        return events
+
+    def feed(self, chunk: str) -> List[OutlineEvent]:
+        """Adds a streamed chunk and returns the events for every line it completed."""
+        text = self._pending + chunk
+        last_newline = text.rfind("\n")
+        if last_newline == -1:
+            self._pending = text
+            return []
+        # Hold back the last, possibly incomplete, line until more text arrives:
+        self._pending = text[last_newline + 1 :]
+        return self._scan(text[: last_newline + 1])
+
+    def close(self) -> List[OutlineEvent]:
+        """Parses any remaining text once the stream has finished."""
+        text, self._pending = self._pending, ""
+        return self._scan(text)
+
+    def parse(self, text: str) -> Dict[str, List[str]]:
+        self._scan(self._pending + text)
+        self._pending = ""
+        return self.outline
+
+
+def parse_outline(text: str) -> Dict[str, List[str]]:
+    """
+    Returns an ordered dictionary of headings and their subheadings.
+
+    Args:
+        text: An outline such as "* Introduction\\n    a. Explanation of data engineering".
+
+    Returns:
+        A dictionary that maps each heading to the list of its subheadings.
+    """
+    return OutlineParser().parse(text)
+
+
+def iter_outline_events(chunks: Iterable[str]) -> Iterator[OutlineEvent]:
+    """Yields outline events as soon as each line of a streamed response is complete."""
+    parser = OutlineParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+if __name__ == "__main__":
+    openai_result = """
+* Introduction
+    a. Explanation of data engineering
+    b. Importance of data engineering in today’s data-driven world
+* Conclusion
+    a. Importance of Data Engineering in the modern business world
+"""
+    print(parse_outline(openai_result))
+
+    # Simulate a streamed completion that arrives a few characters at a time:
+    streamed_chunks = (openai_result[i : i + 7] for i in range(0, len(openai_result), 7))
+    for heading, subheading in iter_outline_events(streamed_chunks):
+        print(f"* {heading}" if subheading is None else f"    - {subheading}")
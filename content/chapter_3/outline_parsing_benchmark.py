@@ -0,0 +1,99 @@
+"""
+Compares the throughput of OutlineParser with the approaches used in
+one_hierarchical_list_generation.py and two_hierarchical_list_generation.py.
+
+Usage:
+    python outline_parsing_benchmark.py --outlines 5000
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import timeit
+
+from outline_parser import OutlineParser, parse_outline
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from content.chapter_3.outline_examples import EXPECTED_OUTLINE, openai_result
+
+# Use the patterns of the two scripts, without printing their results:
+with contextlib.redirect_stdout(io.StringIO()):
+    from content.chapter_3.one_hierarchical_list_generation import (
+        heading_pattern,
+        subheading_pattern,
+    )
+    from content.chapter_3.two_hierarchical_list_generation import (
+        section_regex,
+        subsection_regex,
+    )
+
+
+def one_hierarchical_list_generation(text):
+    # Two separate findall passes, as in one_hierarchical_list_generation.py:
+    headings = re.findall(heading_pattern, text)
+    subheadings = re.findall(subheading_pattern, text)
+    return headings, subheadings
+
+
+def two_hierarchical_list_generation(text):
+    # Split the string and try both regexes on every line, as in two_hierarchical_list_generation.py:
+    result_dict = {}
+    current_section = None
+    for line in text.split("\n"):
+        section_match = section_regex.match(line)
+        subsection_match = subsection_regex.match(line)
+        if section_match:
+            current_section = section_match.group(1)
+            result_dict[current_section] = []
+        elif subsection_match and current_section is not None:
+            result_dict[current_section].append(subsection_match.group(1))
+    return result_dict
+
+
+def stream_outline(text, chunk_size=8):
+    parser = OutlineParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i : i + chunk_size])
+    parser.close()
+    return parser.outline
+
+
+def check_correctness():
+    outline = parse_outline(openai_result)
+    assert outline == EXPECTED_OUTLINE
+    assert list(outline) == list(EXPECTED_OUTLINE)
+    assert stream_outline(openai_result) == outline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--outlines", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    check_correctness()
+
+    outlines = [openai_result.replace("Introduction", f"Introduction {i}") for i in range(args.outlines)]
+    approaches = {
+        "one_hierarchical (2x findall)": one_hierarchical_list_generation,
+        "two_hierarchical (split + match)": two_hierarchical_list_generation,
+        "OutlineParser.parse": parse_outline,
+        "OutlineParser.feed (8 char chunks)": stream_outline,
+    }
+
+    print(f"Parsing {args.outlines} outlines, best of {args.repeat} runs:\n")
+    for name, approach in approaches.items():
+        seconds = min(
+            timeit.repeat(
+                lambda: [approach(outline) for outline in outlines],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"{name:<36}{args.outlines / seconds:>12,.0f} outlines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from collections import deque
+from itertools import tee
+from typing import Any, Deque, Iterator, List, Tuple
+
+try:
+    from .sentence_splitting import iter_sentence_offsets
+    from .token_counting import count_tokens_batch
+except ImportError:
+    from sentence_splitting import iter_sentence_offsets
+    from token_counting import count_tokens_batch
+
+
+def _iter_blocks(text: str, max_block_chars: int) -> Iterator[Tuple[int, str]]:
+    """Splits a long text into blocks at line breaks, yielding (offset, block) pairs."""
+    start = 0
+    while start < len(text):
+        end = min(start + max_block_chars, len(text))
+        if end < len(text):
+            line_break = text.rfind("\n", start, end)
+            if line_break > start:
+                end = line_break + 1
+        yield start, text[start:end]
+        start = end
+
+
+class SentenceChunker:
+    """
+    Packs whole sentences into chunks that stay under a token budget.
+
+    Sentences come from the spaCy segmentation in sentence_splitting.py and are
+    each encoded exactly once. A running token sum decides when a chunk is full,
+    and the last chunk_overlap sentences are repeated at the start of the next
+    chunk. A single sentence that is longer than chunk_size becomes a chunk on
+    its own.
+
+    It can be used in place of the RecursiveCharacterTextSplitter in
+    ContentGenerator, as it provides split_text() and split_documents().
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 400,
+        chunk_overlap: int = 1,
+        encoding_name: str = "cl100k_base",
+        mode: str = "trimmed",
+        batch_size: int = 64,
+        max_block_chars: int = 100_000,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if chunk_overlap < 0:
+            raise ValueError("chunk_overlap must not be negative")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_name = encoding_name
+        self.mode = mode
+        self.batch_size = batch_size
+        # spaCy limits the length of a single document, so long texts are segmented in blocks:
+        self.max_block_chars = max_block_chars
+
+    def _iter_sentences(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yields (start_char, end_char, num_tokens) for every sentence in the text."""
+        blocks, blocks_to_segment = tee(_iter_blocks(text, self.max_block_chars))
+        segmented = iter_sentence_offsets(
+            (block for _, block in blocks_to_segment),
+            mode=self.mode,
+            batch_size=self.batch_size,
+        )
+        for (offset, block), sentence_offsets in zip(blocks, segmented):
+            sentences = [block[start:end] for start, end in sentence_offsets]
+            token_counts = count_tokens_batch(sentences, self.encoding_name)
+            for (start, end), num_tokens in zip(sentence_offsets, token_counts):
+                yield offset + start, offset + end, num_tokens
+
+    def iter_chunk_offsets(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Lazily yields the (start_char, end_char) offsets of each chunk."""
+        window: Deque[Tuple[int, int, int]] = deque()
+        window_tokens = 0
+        has_new_sentences = False
+
+        for sentence in self._iter_sentences(text):
+            num_tokens = sentence[2]
+            if window and has_new_sentences and window_tokens + num_tokens > self.chunk_size:
+                yield window[0][0], window[-1][1]
+                has_new_sentences = False
+                # Keep the overlap sentences, as long as the new sentence still fits:
+                while window and (
+                    len(window) > self.chunk_overlap
+                    or window_tokens + num_tokens > self.chunk_size
+                ):
+                    window_tokens -= window.popleft()[2]
+            window.append(sentence)
+            window_tokens += num_tokens
+            has_new_sentences = True
+
+        if has_new_sentences:
+            yield window[0][0], window[-1][1]
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        for start, end in self.iter_chunk_offsets(text):
+            yield text[start:end]
+
+    def split_text(self, text: str) -> List[str]:
+        return list(self.iter_chunks(text))
+
+    def split_documents(self, documents: List[Any]) -> List[Any]:
+        """Splits LangChain documents, copying each document's metadata onto its chunks."""
+        return [
+            type(document)(page_content=chunk, metadata=dict(document.metadata))
+            for document in documents
+            for chunk in self.iter_chunks(document.page_content)
+        ]
+
+
+if __name__ == "__main__":
+    with open("hubspot_blog_post.txt", "r") as f:
+        text = f.read()
+
+    chunker = SentenceChunker(chunk_size=200, chunk_overlap=1, mode="sentencizer")
+    for chunk in chunker.iter_chunks(text):
+        print("-" * 20)
+        print(chunk)
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Tuple
+
+# Pipeline components that sentence splitting does not need. Not every model or spaCy
+# version has all of them, e.g. the pinned spaCy 2.3 has no attribute_ruler or lemmatizer:
+UNUSED_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer", "ner", "textcat"]
+
+# full: the complete pipeline, as in sentence_detection_in_spacy.py.
+# trimmed: only the dependency parser, which sets the sentence boundaries.
+# sentencizer: a fast rule-based splitter that splits on punctuation.
+MODES = ("full", "trimmed", "sentencizer")
+
+SentenceOffsets = List[Tuple[int, int]]
+
+
+def disable_unused_components(nlp: Any) -> List[str]:
+    """
+    Disables the components of a pipeline that sentence splitting does not need.
+
+    Returns:
+        The names of the disabled components, i.e. those of UNUSED_COMPONENTS
+        that the pipeline has.
+    """
+    import spacy
+
+    unused = [name for name in nlp.pipe_names if name in UNUSED_COMPONENTS]
+    if int(spacy.__version__.split(".")[0]) >= 3:
+        nlp.select_pipes(disable=unused)
+    else:
+        # spaCy 2 removes the components until the returned object is restored:
+        nlp.disable_pipes(*unused)
+    return unused
+
+
+@lru_cache(maxsize=None)
+def load_sentence_pipeline(mode: str = "trimmed", model: str = "en_core_web_sm") -> Any:
+    """
+    Loads a spaCy pipeline for sentence splitting, once per process and mode.
+
+    Args:
+        mode: One of "full", "trimmed" or "sentencizer".
+        model: The name of the spaCy model used by the "full" and "trimmed" modes.
+
+    Returns:
+        The spaCy Language object.
+
+    Raises:
+        ValueError: If the mode is not recognized.
+    """
+    # spaCy takes a while to import, so only import it when a pipeline is needed:
+    import spacy
+
+    if mode == "full":
+        return spacy.load(model)
+    if mode == "trimmed":
+        nlp = spacy.load(model)
+        disable_unused_components(nlp)
+        return nlp
+    if mode == "sentencizer":
+        nlp = spacy.blank("en")
+        if int(spacy.__version__.split(".")[0]) >= 3:
+            nlp.add_pipe("sentencizer")
+        else:
+            nlp.add_pipe(nlp.create_pipe("sentencizer"))
+        return nlp
+    raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+
+
+def iter_sentence_offsets(
+    texts: Iterable[str],
+    mode: str = "trimmed",
+    batch_size: int = 64,
+    n_process: int = 1,
+    model: str = "en_core_web_sm",
+) -> Iterator[SentenceOffsets]:
+    """
+    Splits many documents into sentences with nlp.pipe.
+
+    Args:
+        texts: The documents to be split.
+        mode: One of "full", "trimmed" or "sentencizer".
+        batch_size: The number of documents that spaCy processes per batch.
+        n_process: The number of processes used by nlp.pipe.
+        model: The name of the spaCy model used by the "full" and "trimmed" modes.
+
+    Returns:
+        An iterator with one list of (start_char, end_char) sentence offsets per document.
+    """
+    nlp = load_sentence_pipeline(mode, model)
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield [(sent.start_char, sent.end_char) for sent in doc.sents]
+
+
+def split_sentences(text: str, mode: str = "trimmed") -> List[str]:
+    """Returns the sentences of a single document as strings."""
+    offsets = next(iter_sentence_offsets([text], mode=mode))
+    return [text[start:end] for start, end in offsets]
+
+
+if __name__ == "__main__":
+    texts = ["This is a sentence. This is another sentence.", "Short one. And done!"]
+
+    for text, offsets in zip(texts, iter_sentence_offsets(texts, mode="sentencizer")):
+        for start, end in offsets:
+            print(f"[{start}:{end}] {text[start:end]}")
@@ -0,0 +1,95 @@
+"""
+Compares the full spaCy pipeline, the trimmed pipeline and the rule-based
+sentencizer for sentence splitting throughput and memory.
+
+Usage:
+    python sentence_splitting_benchmark.py --docs 300 --batch-size 64 --n-process 1
+
+Each mode runs in its own subprocess, so the peak RSS of one pipeline does not
+leak into the measurement of the next.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from sentence_splitting import MODES, iter_sentence_offsets, load_sentence_pipeline
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux:
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_documents(num_docs: int):
+    # Use the HubSpot blog post as a stand-in for a scraped page:
+    path = os.path.join(os.path.dirname(__file__), "hubspot_blog_post.txt")
+    with open(path, "r") as f:
+        page = f.read()
+    return [page] * num_docs
+
+
+def run_single(mode: str, num_docs: int, batch_size: int, n_process: int) -> None:
+    texts = load_documents(num_docs)
+
+    start_time = time.perf_counter()
+    load_sentence_pipeline(mode)
+    load_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    sentences = sum(
+        len(offsets)
+        for offsets in iter_sentence_offsets(
+            texts, mode=mode, batch_size=batch_size, n_process=n_process
+        )
+    )
+    elapsed = time.perf_counter() - start_time
+    print(f"{sentences} {load_seconds} {num_docs / elapsed} {_peak_rss_mb()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--run", choices=MODES)
+    args = parser.parse_args()
+
+    if args.run:
+        run_single(args.run, args.docs, args.batch_size, args.n_process)
+        return
+
+    print(
+        f"Splitting {args.docs} documents, batch_size={args.batch_size}, n_process={args.n_process}:\n"
+    )
+    print(f"{'mode':<14}{'sentences':>12}{'load s':>10}{'docs/s':>10}{'peak RSS MB':>14}")
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--run",
+                mode,
+                "--docs",
+                str(args.docs),
+                "--batch-size",
+                str(args.batch_size),
+                "--n-process",
+                str(args.n_process),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        sentences, load_seconds, docs_per_second, peak = output
+        print(
+            f"{mode:<14}{int(sentences):>12}{float(load_seconds):>10.2f}"
+            f"{float(docs_per_second):>10.1f}{float(peak):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
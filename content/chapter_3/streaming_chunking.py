@@ -0,0 +1,130 @@
+import mmap
+from contextlib import contextmanager
+from typing import Iterator, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _snap_to_char_start(buffer: Buffer, position: int) -> int:
+    """Moves a byte offset backwards until it no longer points inside a UTF-8 character."""
+    # UTF-8 continuation bytes look like 0b10xxxxxx:
+    while 0 < position < len(buffer) and (buffer[position] & 0xC0) == 0x80:
+        position -= 1
+    return position
+
+
+def _next_char_start(buffer: Buffer, position: int) -> int:
+    """Returns the offset of the first UTF-8 character that starts after position."""
+    position += 1
+    while position < len(buffer) and (buffer[position] & 0xC0) == 0x80:
+        position += 1
+    return position
+
+
+def iter_chunk_offsets(buffer: Buffer, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily yields (start, end) byte offsets of consecutive, non-overlapping chunks.
+
+    Args:
+        buffer: UTF-8 encoded bytes, e.g. a memory-mapped file.
+        chunk_size: The maximum size of a chunk in bytes.
+
+    Returns:
+        An iterator of (start, end) offsets. Chunk boundaries never split a
+        multi-byte UTF-8 character, so every chunk decodes on its own.
+
+    Raises:
+        ValueError: If chunk_size is smaller than 1.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    length = len(buffer)
+    start = 0
+    while start < length:
+        end = _snap_to_char_start(buffer, min(start + chunk_size, length))
+        if end <= start:
+            # The chunk is smaller than a single character, so take the whole character:
+            end = _next_char_start(buffer, start)
+        yield start, end
+        start = end
+
+
+def iter_sliding_window_offsets(
+    buffer: Buffer, window_size: int, step_size: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily yields (start, end) byte offsets of overlapping windows.
+
+    Mirrors sliding_window() from sliding_window.py, but works on UTF-8 bytes
+    and never copies the text. For ASCII text the offsets match the slices
+    returned by sliding_window() exactly.
+
+    Args:
+        buffer: UTF-8 encoded bytes, e.g. a memory-mapped file.
+        window_size: The size of each window in bytes.
+        step_size: The distance in bytes between the start of two windows.
+
+    Returns:
+        An iterator of (start, end) offsets aligned to UTF-8 character boundaries.
+    """
+    length = len(buffer)
+    if window_size > length or step_size < 1:
+        return
+    for position in range(0, length - window_size + step_size, step_size):
+        start = _snap_to_char_start(buffer, position)
+        end = _snap_to_char_start(buffer, min(position + window_size, length))
+        if end <= start:
+            end = _next_char_start(buffer, start)
+        yield start, end
+
+
+def iter_chunks(
+    buffer: Buffer, chunk_size: int, as_text: bool = False
+) -> Iterator[Union[memoryview, str]]:
+    """
+    Yields chunks as zero-copy memoryview slices, or as decoded strings if as_text is True.
+    """
+    view = memoryview(buffer)
+    for start, end in iter_chunk_offsets(buffer, chunk_size):
+        chunk = view[start:end]
+        yield str(chunk, "utf-8") if as_text else chunk
+
+
+def iter_sliding_windows(
+    buffer: Buffer, window_size: int, step_size: int, as_text: bool = False
+) -> Iterator[Union[memoryview, str]]:
+    """
+    Yields windows as zero-copy memoryview slices, or as decoded strings if as_text is True.
+    """
+    view = memoryview(buffer)
+    for start, end in iter_sliding_window_offsets(buffer, window_size, step_size):
+        window = view[start:end]
+        yield str(window, "utf-8") if as_text else window
+
+
+@contextmanager
+def mapped_text_file(path: str) -> Iterator[Buffer]:
+    """
+    Memory-maps a UTF-8 text file read-only, so chunking never loads the whole file into memory.
+
+    Any memoryview chunks must be released before the block exits, otherwise
+    closing the map raises a BufferError.
+    """
+    with open(path, "rb") as f:
+        # mmap cannot map empty files:
+        if f.seek(0, 2) == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+if __name__ == "__main__":
+    with mapped_text_file("hubspot_blog_post.txt") as buffer:
+        for chunk in iter_chunks(buffer, 200, as_text=True):
+            print("-" * 20)
+            print(chunk)
+
+        text = "This is an example of sliding window text chunking.".encode("utf-8")
+        for idx, chunk in enumerate(iter_sliding_windows(text, 20, 5, as_text=True)):
+            print(f"Chunk {idx + 1}: {chunk}")
@@ -0,0 +1,166 @@
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# orjson is considerably faster than the standard library, so use it when it is installed:
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        return orjson.loads(text)
+
+except ImportError:
+    _loads = json.loads
+
+# Characters that change the nesting depth or start a string outside of a string:
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+# Characters that end a string or escape the next character inside of a string:
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+JSONEntry = Tuple[str, Any]
+
+
+class StreamingJSONObjectParser:
+    """
+    Incrementally parses a JSON object from streamed LLM output.
+
+    Every top-level "key": value entry is returned from feed() as soon as its
+    value is complete, e.g. as soon as the array of a "Heading": [...] entry
+    closes. Anything before the opening brace, such as a ```json code fence,
+    and anything after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {}
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        # Where the current top-level entry starts, or None once it was emitted:
+        self._member_start: Optional[int] = None
+
+    def _emit(self, end: int) -> List[JSONEntry]:
+        if self._member_start is None:
+            return []
+        member = self._buffer[self._member_start : end].strip()
+        self._member_start = None
+        if not member:
+            return []
+        entries = list(_loads("{" + member + "}").items())
+        self.result.update(entries)
+        return entries
+
+    def feed(self, chunk: str) -> List[JSONEntry]:
+        """Adds a streamed chunk and returns every top-level entry that it completed."""
+        if self.done:
+            return []
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = self._pos
+        entries: List[JSONEntry] = []
+
+        while pos < len(buffer):
+            if not self._started:
+                start = buffer.find("{", pos)
+                if start == -1:
+                    pos = len(buffer)
+                    break
+                self._started = True
+                self._depth = 1
+                self._member_start = pos = start + 1
+                continue
+
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    # Wait for the escaped character if it has not arrived yet:
+                    if match.end() >= len(buffer):
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1:
+                    # A nested array or object value has just closed:
+                    entries.extend(self._emit(pos))
+                elif self._depth == 0:
+                    entries.extend(self._emit(pos - 1))
+                    self.done = True
+                    break
+            elif char == "," and self._depth == 1:
+                entries.extend(self._emit(pos - 1))
+                self._member_start = pos
+
+        # Drop the text that has already been parsed:
+        keep_from = pos if self._member_start is None else self._member_start
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._member_start is not None:
+            self._member_start = 0
+        return entries
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Returns the parsed object once the stream has finished.
+
+        Raises:
+            ValueError: If the stream ended before the object was closed.
+        """
+        if not self.done:
+            raise ValueError("The JSON object in the stream was not closed")
+        return self.result
+
+
+def iter_json_entries(chunks: Iterable[str]) -> Iterator[JSONEntry]:
+    """Yields each top-level (key, value) entry of a streamed JSON object as soon as it completes."""
+    parser = StreamingJSONObjectParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+def parse_llm_json(text: str) -> Dict[str, Any]:
+    """Parses a JSON object from LLM output, ignoring code fences and trailing text."""
+    parser = StreamingJSONObjectParser()
+    parser.feed(text)
+    return parser.close()
+
+
+if __name__ == "__main__":
+    openai_json_result = """```json
+{
+    "Introduction": [
+        "a. Overview of coding and programming languages",
+        "b. Importance of coding in today's technology-driven world"],
+    "Conclusion": [
+        "a. Recap of the benefits of learning code",
+        "b. The ongoing importance of coding skills in the modern world"]
+}
+```
+I hope this outline helps!"""
+
+    # Simulate a streamed completion that arrives a few characters at a time:
+    streamed_chunks = (
+        openai_json_result[i : i + 5] for i in range(0, len(openai_json_result), 5)
+    )
+    for heading, subheadings in iter_json_entries(streamed_chunks):
+        print(f"Section ready: {heading} -> {subheadings}")
@@ -1,6 +1,11 @@
 # 1. Import the package:
 import tiktoken
 
+try:
+    from .token_counting import get_encoding, num_tokens_from_messages
+except ImportError:
+    from token_counting import get_encoding, num_tokens_from_messages
+
 # 2. Load an encoding with tiktoken.get_encoding()
 encoding = tiktoken.get_encoding("cl100k_base")
 
@@ -23,7 +28,8 @@ def count_tokens(text_string: str, encoding_name: str) -> int:
     Raises:
         ValueError: If the encoding name is not recognized.
     """
-    encoding = tiktoken.get_encoding(encoding_name)
+    # The encoding is loaded once per process and reused across calls:
+    encoding = get_encoding(encoding_name)
     num_tokens = len(encoding.encode(text_string))
     return num_tokens
 
@@ -33,49 +39,9 @@ text_string = "Hello world! This is a test."
 print(count_tokens(text_string, "cl100k_base"))
 
 
-# Use this function to count the number of tokens in a list of messages:
-def num_tokens_from_messages(messages, model="gpt-3.5-turbo-0613"):
-    """Return the number of tokens used by a list of messages."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model in {
-        "gpt-3.5-turbo-0613",
-        "gpt-3.5-turbo-16k-0613",
-        "gpt-4-0314",
-        "gpt-4-32k-0314",
-        "gpt-4-0613",
-        "gpt-4-32k-0613",
-        }:
-        tokens_per_message = 3
-        tokens_per_name = 1
-    elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        tokens_per_name = -1  # if there's a name, the role is omitted
-    elif "gpt-3.5-turbo" in model:
-        print("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613.")
-        return num_tokens_from_messages(messages, model="gpt-3.5-turbo-0613")
-    elif "gpt-4" in model:
-        print("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return num_tokens_from_messages(messages, model="gpt-4-0613")
-    else:
-        raise NotImplementedError(
-            f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
-        )
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
-    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
-    return num_tokens
-
-
-
+# Use num_tokens_from_messages() from token_counting.py to count the number of tokens in a list of messages.
+# It caches the encoding, looks up the per-message overheads in MESSAGE_OVERHEADS
+# and encodes all of the message values in a single batch:
 example_messages = [
     {
         "role": "system",
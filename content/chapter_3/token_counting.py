@@ -0,0 +1,202 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import tiktoken
+
+
+class MessageOverhead(NamedTuple):
+    tokens_per_message: int
+    tokens_per_name: int
+
+
+# Per-message overheads for each chat model, see:
+# https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
+MESSAGE_OVERHEADS: Dict[str, MessageOverhead] = {
+    "gpt-3.5-turbo-0613": MessageOverhead(3, 1),
+    "gpt-3.5-turbo-16k-0613": MessageOverhead(3, 1),
+    "gpt-4-0314": MessageOverhead(3, 1),
+    "gpt-4-32k-0314": MessageOverhead(3, 1),
+    "gpt-4-0613": MessageOverhead(3, 1),
+    "gpt-4-32k-0613": MessageOverhead(3, 1),
+    # every message follows <|start|>{role/name}\n{content}<|end|>\n
+    # and if there's a name, the role is omitted:
+    "gpt-3.5-turbo-0301": MessageOverhead(4, -1),
+}
+
+# Model families that may update over time, and the snapshot used to count their tokens:
+MODEL_ALIASES: Dict[str, str] = {
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0613",
+    "gpt-4": "gpt-4-0613",
+}
+
+# every reply is primed with <|start|>assistant<|message|>
+REPLY_PRIMING_TOKENS = 3
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
+    """Returns a process-wide tiktoken encoding, loading it only once."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+@lru_cache(maxsize=None)
+def encoding_for_model(model: str) -> tiktoken.Encoding:
+    """Returns the process-wide encoding for a model, falling back to cl100k_base."""
+    try:
+        return get_encoding(tiktoken.encoding_for_model(model).name)
+    except KeyError:
+        print(f"Warning: model {model} not found. Using cl100k_base encoding.")
+        return get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def message_overhead(model: str) -> MessageOverhead:
+    """
+    Returns the per-message token overhead for a model.
+
+    Aliases such as gpt-4 are resolved once per model name and then cached, so
+    counting tokens does not string-match the model name on every call.
+
+    Raises:
+        NotImplementedError: If the model is not a known chat model.
+    """
+    if model in MESSAGE_OVERHEADS:
+        return MESSAGE_OVERHEADS[model]
+    for prefix, snapshot in MODEL_ALIASES.items():
+        if prefix in model:
+            print(
+                f"Warning: {prefix} may update over time. Returning num tokens assuming {snapshot}."
+            )
+            return MESSAGE_OVERHEADS[snapshot]
+    raise NotImplementedError(
+        f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
+    )
+
+
+class TokenCountCache:
+    """
+    A thread-safe LRU cache of token counts keyed on a hash of the text.
+
+    Only the digest is stored, so long system prompts and few-shot examples
+    are not kept in memory by the cache.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._counts: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(encoding_name: str, text: str) -> Tuple[str, bytes]:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return encoding_name, digest
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, bytes], count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+token_count_cache = TokenCountCache()
+
+
+def count_tokens(text_string: str, encoding_name: str = "cl100k_base") -> int:
+    """
+    Returns the number of tokens in a text string, using the cached encoding and counts.
+
+    Args:
+        text_string: The text string to be tokenized.
+        encoding_name: The name of the encoding to be used for tokenization.
+
+    Returns:
+        The number of tokens in the text string.
+    """
+    return count_tokens_batch([text_string], encoding_name)[0]
+
+
+def count_tokens_batch(
+    texts: Sequence[str], encoding_name: str = "cl100k_base", num_threads: int = 8
+) -> List[int]:
+    """
+    Returns the number of tokens in each text string.
+
+    Cached counts are reused, and all of the remaining texts are encoded with a
+    single multi-threaded encode_batch call.
+
+    Args:
+        texts: The text strings to be tokenized.
+        encoding_name: The name of the encoding to be used for tokenization.
+        num_threads: The number of threads used by encode_batch.
+
+    Returns:
+        The number of tokens in each text string, in the same order as texts.
+    """
+    counts: List[Optional[int]] = [None] * len(texts)
+    missing: Dict[Tuple[str, bytes], List[int]] = {}
+    for index, text in enumerate(texts):
+        key = TokenCountCache.key(encoding_name, text)
+        count = token_count_cache.get(key)
+        if count is None:
+            missing.setdefault(key, []).append(index)
+        else:
+            counts[index] = count
+
+    if missing:
+        keys = list(missing)
+        encoded = get_encoding(encoding_name).encode_batch(
+            [texts[missing[key][0]] for key in keys],
+            num_threads=num_threads,
+            disallowed_special=(),
+        )
+        for key, tokens in zip(keys, encoded):
+            token_count_cache.put(key, len(tokens))
+            for index in missing[key]:
+                counts[index] = len(tokens)
+
+    return counts  # type: ignore[return-value]
+
+
+def num_tokens_from_messages(
+    messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo-0613"
+) -> int:
+    """Return the number of tokens used by a list of messages."""
+    overhead = message_overhead(model)
+    encoding_name = encoding_for_model(model).name
+
+    values = [value for message in messages for value in message.values()]
+    num_tokens = sum(count_tokens_batch(values, encoding_name))
+    num_tokens += overhead.tokens_per_message * len(messages)
+    num_tokens += overhead.tokens_per_name * sum("name" in m for m in messages)
+    num_tokens += REPLY_PRIMING_TOKENS
+    return num_tokens
+
+
+if __name__ == "__main__":
+    system_prompt = "You are a helpful, pattern-following assistant."
+    prompts = [f"{system_prompt} Question {i}" for i in range(1000)] + [system_prompt] * 1000
+    print(sum(count_tokens_batch(prompts)))
+    print(count_tokens(system_prompt))
+    print(f"Cache hits: {token_count_cache.hits}, misses: {token_count_cache.misses}")
@@ -0,0 +1,99 @@
+from array import array
+from typing import Iterator, List, NamedTuple, Optional
+
+import tiktoken
+
+
+class TokenWindow(NamedTuple):
+    start_token: int
+    end_token: int
+    start_char: int
+    end_char: int
+
+
+class TokenSlidingWindow:
+    """
+    Encodes a document once and produces sliding windows as token index ranges.
+
+    The token IDs and the character offset of every token are stored in compact
+    array('I') buffers, so windows are cheap to produce and are only decoded
+    when their text is actually needed.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        encoding_name: str = "cl100k_base",
+        encoding: Optional[tiktoken.Encoding] = None,
+    ):
+        self.text = text
+        self.encoding = encoding or tiktoken.get_encoding(encoding_name)
+        # Special tokens such as <|endoftext|> are treated as plain text:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        self.tokens = array("I", tokens)
+        self.offsets = array("I", offsets)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _char_offset(self, token_index: int) -> int:
+        if token_index >= len(self.offsets):
+            return len(self.text)
+        return self.offsets[token_index]
+
+    def windows(self, window_size: int, step_size: int) -> Iterator[TokenWindow]:
+        """
+        Yields windows of window_size tokens, starting every step_size tokens.
+
+        Follows the same rules as sliding_window() in sliding_window.py, except
+        that sizes are measured in tokens instead of characters.
+        """
+        num_tokens = len(self.tokens)
+        if window_size > num_tokens or step_size < 1:
+            return
+        for start in range(0, num_tokens - window_size + step_size, step_size):
+            end = min(start + window_size, num_tokens)
+            yield TokenWindow(
+                start, end, self._char_offset(start), self._char_offset(end)
+            )
+
+    def decode(self, window: TokenWindow) -> str:
+        """Decodes the token IDs of a window back into text."""
+        return self.encoding.decode(
+            self.tokens[window.start_token : window.end_token].tolist()
+        )
+
+    def source_text(self, window: TokenWindow) -> str:
+        """Returns the slice of the original text that a window covers."""
+        return self.text[window.start_char : window.end_char]
+
+
+def token_sliding_window(
+    text: str, window_size: int, step_size: int, encoding_name: str = "cl100k_base"
+) -> List[str]:
+    """
+    Returns the text of every token window, encoding the document only once.
+
+    Args:
+        text: The text to be split into windows.
+        window_size: The number of tokens in each window.
+        step_size: The number of tokens between the start of two windows.
+        encoding_name: The name of the tiktoken encoding to be used.
+
+    Returns:
+        The decoded text of each window.
+    """
+    sliding_window = TokenSlidingWindow(text, encoding_name=encoding_name)
+    return [sliding_window.decode(w) for w in sliding_window.windows(window_size, step_size)]
+
+
+if __name__ == "__main__":
+    text = "This is an example of sliding window text chunking, measured in tokens."
+    sliding_window = TokenSlidingWindow(text)
+
+    for idx, window in enumerate(sliding_window.windows(window_size=6, step_size=3)):
+        print(
+            f"Chunk {idx + 1} (tokens {window.start_token}-{window.end_token}, "
+            f"chars {window.start_char}-{window.end_char}): {sliding_window.decode(window)}"
+        )
@@ -0,0 +1,58 @@
+"""
+Compares the pure-Python yaml.safe_load with the libyaml-backed loader used by
+load_response() and load_responses() in yml_parsing.py.
+
+Usage:
+    python yaml_loader_benchmark.py --responses 20000
+"""
+import argparse
+import time
+
+import yaml
+
+from yml_parsing import (
+    SafeLoader,
+    compile_schema,
+    fake_response_1,
+    fake_response_2,
+    fake_response_3,
+    load_response,
+    load_responses,
+    schema,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=20_000)
+    args = parser.parse_args()
+
+    samples = [fake_response_1, fake_response_2, fake_response_3]
+    responses = [samples[i % len(samples)] for i in range(args.responses)]
+    stream = "\n---\n".join(responses)
+    validator = compile_schema(schema)
+
+    print(f"Loading and validating {len(responses):,} responses with {SafeLoader.__name__}:\n")
+
+    def report(name, seconds, invalid):
+        print(f"{name:<40}{len(responses) / seconds:>12,.0f} responses/s  ({invalid:,} invalid)")
+
+    start_time = time.perf_counter()
+    invalid = len(validator.validate_many(yaml.safe_load(r) for r in responses))
+    report("yaml.safe_load per response", time.perf_counter() - start_time, invalid)
+
+    start_time = time.perf_counter()
+    invalid = len(validator.validate_many(load_response(r) for r in responses))
+    report("load_response per response", time.perf_counter() - start_time, invalid)
+
+    start_time = time.perf_counter()
+    invalid = len(validator.validate_many(yaml.safe_load_all(stream)))
+    report("yaml.safe_load_all on one stream", time.perf_counter() - start_time, invalid)
+
+    start_time = time.perf_counter()
+    invalid = len(validator.validate_many(load_responses(stream)))
+    report("load_responses on one stream", time.perf_counter() - start_time, invalid)
+
+
+if __name__ == "__main__":
+    main()
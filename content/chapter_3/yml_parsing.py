@@ -1,5 +1,15 @@
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, Iterator, List, Union
+
 import yaml
 
+# Use the libyaml-backed loader when PyYAML was built with it, as it is much
+# faster than the pure-Python loader:
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 
 class InvalidResponse(Exception):
     pass
@@ -42,38 +52,113 @@ schema = """
 """
 
 
+def load_response(response: Union[str, IO]) -> Any:
+    """Parses a single YAML document with the fastest available safe loader."""
+    return yaml.load(response, Loader=SafeLoader)
+
+
+def load_responses(stream: Union[str, IO]) -> Iterator[Any]:
+    """
+    Lazily parses a multi-document YAML stream, such as many LLM responses
+    separated by "---", with a single loader.
+    """
+    return yaml.load_all(stream, Loader=SafeLoader)
+
+
+class SchemaValidator:
+    """
+    Validates parsed YAML responses against a schema that is compiled only once.
+
+    The schema is parsed a single time and the allowed item names and units are
+    kept in frozensets, so each item is checked in O(1) instead of scanning the
+    schema for every item.
+    """
+
+    REQUIRED_KEYS = ("item", "quantity", "unit")
+
+    def __init__(
+        self,
+        schema: str,
+        max_quantity: int = 10,
+        allowed_units: Iterable[str] = ("pieces", "dozen"),
+    ):
+        schema_parsed = load_response(schema)
+        self.allowed_names = frozenset(x["item"] for x in schema_parsed)
+        allowed_units = tuple(allowed_units)
+        self.allowed_units = frozenset(allowed_units)
+        self.max_quantity = max_quantity
+        self._units_message = " or ".join(allowed_units)
+
+    def iter_violations(self, response: Any) -> Iterator[Exception]:
+        """Yields every violation in a response, in the order validate() checks them."""
+        # Check if the response is a list
+        if not isinstance(response, list):
+            yield InvalidResponse("Response is not a list")
+            return
+
+        for item in response:
+            # Check if each item in the list is a dictionary
+            if not isinstance(item, dict):
+                yield InvalidItemType("Response item is not a dictionary")
+                continue
+
+            # Check if each dictionary has the keys "item", "quantity", and "unit"
+            if not all(key in item for key in self.REQUIRED_KEYS):
+                yield InvalidItemKeys("Response item does not have the correct keys")
+                continue
+
+            name, quantity, unit = item["item"], item["quantity"], item["unit"]
+
+            # Check if the values associated with each key are the correct type
+            name_is_valid = isinstance(name, str)
+            quantity_is_valid = isinstance(quantity, int)
+            unit_is_valid = isinstance(unit, str)
+            if not name_is_valid:
+                yield InvalidItemName("Response item name is not a string")
+            if not quantity_is_valid:
+                yield InvalidItemQuantity("Response item quantity is not an integer")
+            if not unit_is_valid:
+                yield InvalidItemUnit("Response item unit is not a string")
+
+            # Check if the values associated with each key are the correct value
+            if name_is_valid and name not in self.allowed_names:
+                yield InvalidItemName("Response item name is not in schema")
+            if quantity_is_valid and quantity > self.max_quantity:
+                yield InvalidItemQuantity(
+                    f"Response item quantity is greater than {self.max_quantity}"
+                )
+            if unit_is_valid and unit not in self.allowed_units:
+                yield InvalidItemUnit(
+                    f"Response item unit is not {self._units_message}"
+                )
+
+    def validate(self, response: Any) -> None:
+        """Raises the first violation in a response, if there is one."""
+        for violation in self.iter_violations(response):
+            raise violation
+
+    def validate_many(self, responses: Iterable[Any]) -> Dict[int, List[Exception]]:
+        """
+        Validates a batch of responses and reports all of their violations at once.
+
+        Returns:
+            A dictionary that maps the index of every invalid response to its violations.
+        """
+        violations = {}
+        for index, response in enumerate(responses):
+            response_violations = list(self.iter_violations(response))
+            if response_violations:
+                violations[index] = response_violations
+        return violations
+
+
+@lru_cache(maxsize=32)
+def compile_schema(schema: str) -> SchemaValidator:
+    return SchemaValidator(schema)
+
+
 def validate_response(response, schema):
-    # Parse the schema
-    schema_parsed = yaml.safe_load(schema)
-
-    # Check if the response is a list
-    if not isinstance(response, list):
-        raise InvalidResponse("Response is not a list")
-
-    # Check if each item in the list is a dictionary
-    for item in response:
-        if not isinstance(item, dict):
-            raise InvalidItemType("Response item is not a dictionary")
-
-        # Check if each dictionary has the keys "item", "quantity", and "unit"
-        if not all(key in item for key in ("item", "quantity", "unit")):
-            raise InvalidItemKeys("Response item does not have the correct keys")
-
-        # Check if the values associated with each key are the correct type
-        if not isinstance(item["item"], str):
-            raise InvalidItemName("Response item name is not a string")
-        if not isinstance(item["quantity"], int):
-            raise InvalidItemQuantity("Response item quantity is not an integer")
-        if not isinstance(item["unit"], str):
-            raise InvalidItemUnit("Response item unit is not a string")
-
-        # Check if the values associated with each key are the correct value
-        if item["item"] not in [x["item"] for x in schema_parsed]:
-            raise InvalidItemName("Response item name is not in schema")
-        if item["quantity"] > 10:
-            raise InvalidItemQuantity("Response item quantity is greater than 10")
-        if item["unit"] not in ["pieces", "dozen"]:
-            raise InvalidItemUnit("Response item unit is not pieces or dozen")
+    compile_schema(schema).validate(response)
 
 
 # Fake responses
@@ -95,26 +180,33 @@ fake_response_2 = """
 
 fake_response_3 = """Unmatched"""
 
-# Parse the fake responses
-response_1_parsed = yaml.safe_load(fake_response_1)
-response_2_parsed = yaml.safe_load(fake_response_2)
-response_3_parsed = yaml.safe_load(fake_response_3)
-
-# Validate the responses against the schema
-try:
-    validate_response(response_1_parsed, schema)
-    print("Response 1 is valid")
-except Exception as e:
-    print("Response 1 is invalid:", str(e))
-
-try:
-    validate_response(response_2_parsed, schema)
-    print("Response 2 is valid")
-except Exception as e:
-    print("Response 2 is invalid:", str(e))
-
-try:
-    validate_response(response_3_parsed, schema)
-    print("Response 3 is valid")
-except Exception as e:
-    print("Response 3 is invalid:", str(e))
+if __name__ == "__main__":
+    # Parse the fake responses
+    response_1_parsed = load_response(fake_response_1)
+    response_2_parsed = load_response(fake_response_2)
+    response_3_parsed = load_response(fake_response_3)
+
+    # Validate the responses against the schema
+    try:
+        validate_response(response_1_parsed, schema)
+        print("Response 1 is valid")
+    except Exception as e:
+        print("Response 1 is invalid:", str(e))
+
+    try:
+        validate_response(response_2_parsed, schema)
+        print("Response 2 is valid")
+    except Exception as e:
+        print("Response 2 is invalid:", str(e))
+
+    try:
+        validate_response(response_3_parsed, schema)
+        print("Response 3 is valid")
+    except Exception as e:
+        print("Response 3 is invalid:", str(e))
+
+    # Validate a multi-document stream of responses with a single loader:
+    stream = "\n---\n".join([fake_response_1, fake_response_2, fake_response_3])
+    violations = compile_schema(schema).validate_many(load_responses(stream))
+    for index, errors in violations.items():
+        print(f"Streamed response {index + 1} is invalid:", [str(e) for e in errors])
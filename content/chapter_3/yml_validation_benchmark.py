@@ -0,0 +1,88 @@
+"""
+Compares validating parsed YAML responses with the original validate_response()
+and with a compiled SchemaValidator.
+
+Usage:
+    python yml_validation_benchmark.py --responses 100000
+"""
+import argparse
+import time
+
+import yaml
+
+from yml_parsing import (
+    SchemaValidator,
+    fake_response_1,
+    fake_response_2,
+    fake_response_3,
+    schema,
+)
+
+
+def original_validate_response(response, schema):
+    # The validate_response() from yml_parsing.py before the schema was compiled,
+    # shortened to the checks that dominate its run time:
+    schema_parsed = yaml.safe_load(schema)
+    if not isinstance(response, list):
+        raise ValueError("Response is not a list")
+    for item in response:
+        if not isinstance(item, dict):
+            raise ValueError("Response item is not a dictionary")
+        if not all(key in item for key in ("item", "quantity", "unit")):
+            raise ValueError("Response item does not have the correct keys")
+        if not isinstance(item["item"], str):
+            raise ValueError("Response item name is not a string")
+        if not isinstance(item["quantity"], int):
+            raise ValueError("Response item quantity is not an integer")
+        if not isinstance(item["unit"], str):
+            raise ValueError("Response item unit is not a string")
+        if item["item"] not in [x["item"] for x in schema_parsed]:
+            raise ValueError("Response item name is not in schema")
+        if item["quantity"] > 10:
+            raise ValueError("Response item quantity is greater than 10")
+        if item["unit"] not in ["pieces", "dozen"]:
+            raise ValueError("Response item unit is not pieces or dozen")
+
+
+def count_invalid(validate, responses):
+    invalid = 0
+    for response in responses:
+        try:
+            validate(response)
+        except Exception:
+            invalid += 1
+    return invalid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=100_000)
+    # The original validator parses the schema for every response, so it is
+    # timed on a smaller sample and reported as a rate:
+    parser.add_argument("--baseline-responses", type=int, default=5_000)
+    args = parser.parse_args()
+
+    samples = [yaml.safe_load(r) for r in (fake_response_1, fake_response_2, fake_response_3)]
+    responses = [samples[i % len(samples)] for i in range(args.responses)]
+    print(f"Validating {len(responses):,} parsed responses:\n")
+
+    def report(name, seconds, count, invalid):
+        print(f"{name:<32}{count / seconds:>14,.0f} responses/s  ({invalid:,} of {count:,} invalid)")
+
+    baseline = responses[: args.baseline_responses]
+    start_time = time.perf_counter()
+    invalid = count_invalid(lambda r: original_validate_response(r, schema), baseline)
+    report("original validate_response", time.perf_counter() - start_time, len(baseline), invalid)
+
+    start_time = time.perf_counter()
+    validator = SchemaValidator(schema)
+    invalid = count_invalid(validator.validate, responses)
+    report("SchemaValidator.validate", time.perf_counter() - start_time, len(responses), invalid)
+
+    start_time = time.perf_counter()
+    violations = validator.validate_many(responses)
+    report("SchemaValidator.validate_many", time.perf_counter() - start_time, len(responses), len(violations))
+
+
+if __name__ == "__main__":
+    main()
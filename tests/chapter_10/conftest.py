@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The chapter 10 modules import each other by module name, as they are run from their own folder:
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "..", "content", "chapter_10")
+)
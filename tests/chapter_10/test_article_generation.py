@@ -0,0 +1,190 @@
+import asyncio
+import re
+import time
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from article_generation import ContentGenerator
+from article_outline_generation import BlogOutline, SubHeading
+
+
+class SectionEchoModel(FakeListChatModel):
+    """Answers with the title of the section it is asked to write, slower for earlier sections."""
+
+    def _call(self, messages, *args, **kwargs):
+        title = re.search(r"writing the section: (.+)", messages[-1].content).group(1)
+        time.sleep(0.05 / (1 + int(title.split()[-1])))
+        return f"## {title}"
+
+
+class StreamingModel(FakeListChatModel):
+    def get_num_tokens_from_messages(self, messages):
+        return sum(len(message.content.split()) for message in messages)
+
+
+def make_generator(monkeypatch, llm, num_sections=4):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    generator = ContentGenerator(
+        topic="Memetics",
+        outline=BlogOutline(
+            title="Memetics",
+            sub_headings=[SubHeading(title=f"Section {i}") for i in range(num_sections)],
+        ),
+        questions_and_answers={},
+        text_splitter=RecursiveCharacterTextSplitter(),
+        llm=llm,
+        embeddings=FakeEmbeddings(),
+    )
+    monkeypatch.setattr(generator, "_retrieve_relevant_documents", lambda subheading: "")
+    return generator
+
+
+def test_concurrent_sections_come_back_in_outline_order(monkeypatch):
+    generator = make_generator(monkeypatch, SectionEchoModel(responses=[""]))
+
+    blog_post = asyncio.run(generator.agenerate_blog_post(max_concurrency=4))
+
+    assert blog_post == [f"## Section {i}" for i in range(4)]
+
+
+def test_deduplication_pass_splits_on_section_markers(monkeypatch):
+    rewritten = "<<<SECTION 0>>>\n## A\nOnly here.\n<<<SECTION 1>>>\n## B\nNot repeated."
+    generator = make_generator(monkeypatch, FakeListChatModel(responses=[rewritten]))
+
+    sections = asyncio.run(generator.adeduplicate_sections(["## A", "## B"]))
+
+    assert sections == ["## A\nOnly here.", "## B\nNot repeated."]
+
+
+def test_deduplication_pass_keeps_the_originals_without_markers(monkeypatch):
+    generator = make_generator(monkeypatch, FakeListChatModel(responses=["## A and B"]))
+
+    sections = asyncio.run(generator.adeduplicate_sections(["## A", "## B"]))
+
+    assert sections == ["## A", "## B"]
+
+
+def test_streaming_yields_tokens_then_complete_sections(monkeypatch):
+    generator = make_generator(
+        monkeypatch, StreamingModel(responses=["## A", "## B"]), num_sections=2
+    )
+
+    async def collect():
+        return [event async for event in generator.astream_blog_post()]
+
+    events = asyncio.run(collect())
+
+    assert [e.text for e in events if e.kind == "token"] == list("## A") + list("## B")
+    assert [(e.section_index, e.text) for e in events if e.kind == "section"] == [
+        (0, "## A"),
+        (1, "## B"),
+    ]
+    # Later sections can read the earlier ones from memory, as with generate_blog_post():
+    messages = generator.blog_post_chain.memory.chat_memory.messages
+    assert [m.content for m in messages] == ["## A", "## B"]
+
+
+class FakeCollection:
+    def __init__(self, texts):
+        self.texts = texts
+        self.queries = []
+
+    def count(self):
+        return len(self.texts)
+
+    def query(self, query_embeddings, n_results, include):
+        self.queries.append((len(query_embeddings), n_results))
+        return {
+            "documents": [self.texts[:n_results] for _ in query_embeddings],
+            "metadatas": [[None] * n_results for _ in query_embeddings],
+        }
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text))]
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.queries = []
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        self.queries.append((embedding, k))
+        return [Document(page_content=f"chunk for {embedding}")]
+
+
+def test_subheadings_are_retrieved_in_one_batch_and_cached(monkeypatch, tmp_path):
+    from langchain_community.vectorstores.chroma import Chroma
+
+    from embedding_cache import CachedEmbeddings, EmbeddingStore
+
+    generator = make_generator(monkeypatch, FakeListChatModel(responses=[""]))
+    collection = FakeCollection(["chunk a", "chunk b"])
+    generator.chroma_db = Chroma.__new__(Chroma)
+    generator.chroma_db._collection = collection
+    backend = FakeEmbeddings()
+    generator.embeddings = CachedEmbeddings(
+        backend, EmbeddingStore(str(tmp_path)), queries_as_documents=True
+    )
+
+    titles = ["Section 0", "Section 1", "Section 0", "Section 2"]
+    first = generator.retrieve_relevant_documents(titles)
+    second = generator.retrieve_relevant_documents(["Section 1"])
+
+    # k is capped at the two chunks in the collection:
+    assert collection.queries == [(3, 2)]
+    # The distinct titles are embedded in a single call:
+    assert backend.calls == [["Section 0", "Section 1", "Section 2"]]
+    assert [d.page_content for d in first["Section 2"]] == ["chunk a", "chunk b"]
+    assert second["Section 1"] == first["Section 1"]
+
+
+def test_other_vector_stores_are_searched_through_the_public_api(monkeypatch):
+    generator = make_generator(monkeypatch, FakeListChatModel(responses=[""]))
+    generator.chroma_db = FakeVectorStore()
+
+    documents = generator.retrieve_relevant_documents(["Section 0", "Section 10"])
+
+    assert generator.chroma_db.queries == [([9.0], 5), ([10.0], 5)]
+    assert documents["Section 10"][0].page_content == "chunk for [10.0]"
+
+
+def test_streamed_sections_are_cached_and_replayed(monkeypatch, tmp_path):
+    from response_cache import ReplayCacheMiss, ResponseCache
+
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+
+    async def collect(generator):
+        return [event async for event in generator.astream_blog_post()]
+
+    def model():
+        return StreamingModel(responses=["## A", "## B"], cache=cache)
+
+    streamed = asyncio.run(collect(make_generator(monkeypatch, model(), num_sections=2)))
+    assert [e.text for e in streamed if e.kind == "token"] == list("## A") + list("## B")
+    assert cache.stats()["entries"] == 2
+
+    # A second run is served from the cache, with each section as a single token event:
+    replayed = asyncio.run(collect(make_generator(monkeypatch, model(), num_sections=2)))
+    assert [e.text for e in replayed if e.kind == "token"] == ["## A", "## B"]
+    assert cache.hits == 2
+
+    cache.clear()
+    cache.replay = True
+    with pytest.raises(ReplayCacheMiss):
+        asyncio.run(collect(make_generator(monkeypatch, model(), num_sections=2)))
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("langchain_community")
+pytest.importorskip("serpapi")
+
+from content_collection import ChromiumLoader
+
+
+class FixturePageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(5)
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        body = f"<html><body><h1>Page {self.path}</h1></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixturePageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_pages_are_returned_in_input_order(fixture_server):
+    urls = [f"{fixture_server}/page-{i}" for i in range(6)]
+    documents = asyncio.run(ChromiumLoader(urls, max_concurrency=3).load())
+    assert [d.metadata["source"] for d in documents] == urls
+    for i, document in enumerate(documents):
+        assert f"Page /page-{i}" in document.page_content
+
+
+def test_slow_and_broken_pages_do_not_fail_the_batch(fixture_server):
+    urls = [
+        f"{fixture_server}/slow",
+        "http://127.0.0.1:1/unreachable",
+        f"{fixture_server}/page-ok",
+    ]
+    documents = asyncio.run(ChromiumLoader(urls, max_concurrency=3, timeout=1).load())
+    assert documents[0].page_content.startswith("Error: timed out")
+    assert documents[1].page_content.startswith("Error:")
+    assert "Page /page-ok" in documents[2].page_content
+
+
+class FakePage:
+    async def goto(self, url):
+        self.url = url
+
+    async def content(self):
+        if self.url.endswith("/slow-content"):
+            await asyncio.sleep(5)
+        return f"<html><body>{self.url}</body></html>"
+
+
+class FakeContext:
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = 0
+
+    async def new_context(self):
+        self.contexts += 1
+        if self.contexts == 1:
+            raise RuntimeError("Browser closed")
+        return FakeContext()
+
+
+def test_context_failures_and_slow_content_do_not_fail_the_batch():
+    urls = ["https://example.com/a", "https://example.com/slow-content", "https://example.com/b"]
+    loader = ChromiumLoader(urls, timeout=0.1)
+
+    async def scrape():
+        loader._browser = FakeBrowser()
+        loader._semaphore = asyncio.Semaphore(1)
+        return [await loader.ascrape_document(url) for url in urls]
+
+    documents = asyncio.run(scrape())
+
+    assert documents[0].page_content == "Error: Browser closed"
+    assert documents[1].page_content.startswith("Error: timed out")
+    assert urls[2] in documents[2].page_content
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from langchain.output_parsers import PydanticOutputParser
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from custom_summarize_chain import DocumentSummarizer, DocumentSummary
+
+
+class CountingChatModel(FakeListChatModel):
+    prompts: list = []
+
+    def _call(self, messages, *args, **kwargs):
+        self.prompts.append(messages[0].content)
+        return super()._call(messages, *args, **kwargs)
+
+
+def make_summarizer(**kwargs):
+    summary = json.dumps(
+        {"concise_summary": "Short.", "writing_style": "Plain", "key_points": ["A"]}
+    )
+    return DocumentSummarizer(
+        PydanticOutputParser(pydantic_object=DocumentSummary),
+        RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0),
+        CountingChatModel(responses=[summary], prompts=[]),
+        **kwargs,
+    )
+
+
+def long_document(paragraphs):
+    return Document(
+        page_content="\n\n".join(f"Paragraph {i}. " + "word " * 15 for i in range(paragraphs)),
+        metadata={"source": "long"},
+    )
+
+
+def test_summarizer_uses_the_given_model():
+    summarizer = make_summarizer()
+    document = Document(page_content="Memes spread.", metadata={"source": "a"})
+
+    summary = asyncio.run(summarizer.asummarize(document))
+
+    assert summary.concise_summary == "Short."
+    assert summary.metadata == {"source": "a"}
+
+
+def test_abatch_keeps_the_document_order():
+    summarizer = make_summarizer()
+    documents = [
+        Document(page_content="First page.", metadata={"source": "a"}),
+        Document(page_content="", metadata={"source": "empty"}),
+        Document(page_content="Third page.", metadata={"source": "c"}),
+    ]
+
+    summaries = asyncio.run(summarizer.abatch(documents, max_concurrency=2))
+
+    assert summaries[1] is None
+    assert [s.metadata["source"] for s in (summaries[0], summaries[2])] == ["a", "c"]
+
+
+def test_only_the_first_chunk_is_summarized_by_default():
+    summarizer = make_summarizer()
+
+    asyncio.run(summarizer.asummarize(long_document(10)))
+
+    assert len(summarizer.llm.prompts) == 1
+    assert "Paragraph 0." in summarizer.llm.prompts[0]
+
+
+def test_map_reduce_summarizes_every_chunk_and_reduces_hierarchically():
+    summarizer = make_summarizer(map_reduce=True, reduce_fan_in=4)
+
+    summary = asyncio.run(summarizer.asummarize(long_document(10)))
+
+    # 10 chunk summaries, then 3 and 1 reduce calls:
+    prompts = summarizer.llm.prompts
+    assert len(prompts) == 14
+    assert sum("Paragraph 9." in prompt for prompt in prompts) == 1
+    assert summary.metadata == {"source": "long"}
+
+
+def test_token_budget_samples_chunks_across_the_document():
+    summarizer = make_summarizer(map_reduce=True, max_tokens=400, token_counter=len)
+
+    chunks = summarizer.select_chunks(long_document(10))
+
+    assert [chunk.page_content.split(".")[0] for chunk in chunks] == [
+        "Paragraph 0",
+        "Paragraph 3",
+        "Paragraph 6",
+        "Paragraph 9",
+    ]
+
+
+def test_the_scheduler_is_charged_for_every_map_reduce_call():
+    from custom_summarize_chain import create_all_summaries
+    from rate_limiter import RateLimitedScheduler
+
+    summarizer = make_summarizer()
+    scheduler = RateLimitedScheduler(
+        requests_per_minute=10_000, tokens_per_minute=10**7, token_counter=len
+    )
+
+    summaries = asyncio.run(
+        create_all_summaries(
+            [long_document(10), long_document(2)],
+            summarizer.parser,
+            summarizer.llm,
+            summarizer.text_splitter,
+            scheduler=scheduler,
+            map_reduce=True,
+        )
+    )
+
+    # 10 chunk and 3 + 1 reduce calls, then 2 chunk and 1 reduce calls:
+    assert len(summaries) == 2
+    assert scheduler.requests == len(summarizer.llm.prompts) == 17
+
+
+def test_create_summary_from_text_reuses_the_summarizer_per_llm():
+    from custom_summarize_chain import _summarizers, create_summary_from_text
+
+    summarizer = make_summarizer()
+    document = Document(page_content="Memes spread.", metadata={"source": "a"})
+
+    async def summarize_twice():
+        for _ in range(2):
+            await create_summary_from_text(
+                document, summarizer.parser, summarizer.llm, summarizer.text_splitter
+            )
+
+    before = len(_summarizers)
+    asyncio.run(summarize_twice())
+
+    assert len(_summarizers) == before + 1
+    assert len(summarizer.llm.prompts) == 2
@@ -0,0 +1,108 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings, EmbeddingStore
+
+
+class CountingEmbeddings(Embeddings):
+    model = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 0.0, 0.0]
+
+
+def test_only_missing_chunks_are_embedded_in_batches(tmp_path):
+    backend = CountingEmbeddings()
+    embeddings = CachedEmbeddings(backend, EmbeddingStore(str(tmp_path)), batch_size=2)
+
+    first = embeddings.embed_documents(["a", "bb", "a", "ccc"])
+    second = embeddings.embed_documents(["ccc", "dddd", "bb"])
+
+    assert backend.calls == [["a", "bb"], ["ccc"], ["dddd"]]
+    assert first == [[1.0, 1.0, 0.5], [2.0, 1.0, 0.5], [1.0, 1.0, 0.5], [3.0, 1.0, 0.5]]
+    assert second == [[3.0, 1.0, 0.5], [4.0, 1.0, 0.5], [2.0, 1.0, 0.5]]
+    assert embeddings.store.stats()["entries"] == 4
+
+
+def test_embeddings_persist_across_stores_and_models_are_kept_apart(tmp_path):
+    CachedEmbeddings(CountingEmbeddings(), EmbeddingStore(str(tmp_path))).embed_documents(
+        ["hello", "world!"]
+    )
+
+    backend = CountingEmbeddings()
+    reopened = CachedEmbeddings(backend, EmbeddingStore(str(tmp_path)))
+    assert reopened.embed_documents(["world!", "hello"]) == [
+        [6.0, 1.0, 0.5],
+        [5.0, 1.0, 0.5],
+    ]
+    assert backend.calls == []
+
+    other_model = CachedEmbeddings(backend, EmbeddingStore(str(tmp_path)), model_name="other")
+    other_model.embed_documents(["hello"])
+    assert backend.calls == [["hello"]]
+
+
+def test_queries_are_cached_apart_from_documents(tmp_path):
+    backend = CountingEmbeddings()
+    embeddings = CachedEmbeddings(backend, EmbeddingStore(str(tmp_path)))
+
+    embeddings.embed_documents(["abc"])
+    assert embeddings.embed_query("abc") == [3.0, 0.0, 0.0]
+    assert embeddings.embed_query("abc") == [3.0, 0.0, 0.0]
+    assert backend.calls == [["abc"], ["abc"]]
+
+
+def test_missing_queries_are_embedded_in_one_batch(tmp_path):
+    backend = CountingEmbeddings()
+    embeddings = CachedEmbeddings(
+        backend, EmbeddingStore(str(tmp_path)), queries_as_documents=True
+    )
+
+    embeddings.embed_queries(["a", "bb"])
+    vectors = embeddings.embed_queries(["bb", "ccc", "a"])
+
+    assert backend.calls == [["a", "bb"], ["ccc"]]
+    assert vectors == [[2.0, 1.0, 0.5], [3.0, 1.0, 0.5], [1.0, 1.0, 0.5]]
+
+
+def test_float16_store_halves_the_file_size(tmp_path):
+    texts = [f"chunk {i}" for i in range(10)]
+    sizes = {}
+    for dtype in ("float32", "float16"):
+        store = EmbeddingStore(str(tmp_path), dtype=dtype)
+        vectors = CachedEmbeddings(CountingEmbeddings(), store).embed_documents(texts)
+        sizes[dtype] = store.stats()["bytes"]
+        np.testing.assert_allclose(vectors[3], [7.0, 1.0, 0.5], rtol=1e-3)
+
+    assert sizes == {"float32": 10 * 3 * 4, "float16": 10 * 3 * 2}
+
+
+def test_the_store_is_created_on_first_use_and_can_be_closed(tmp_path):
+    directory = tmp_path / "embeddings"
+    embeddings = CachedEmbeddings(CountingEmbeddings(), EmbeddingStore(str(directory)))
+    assert not directory.exists()
+
+    embeddings.embed_documents(["a"])
+    embeddings.close()
+    assert directory.exists()
+    # The store reconnects if it is used again:
+    assert embeddings.embed_documents(["a"]) == [[1.0, 1.0, 0.5]]
+
+
+def test_dimensions_are_part_of_the_cache_key(tmp_path):
+    backend = CountingEmbeddings()
+    backend.dimensions = 256
+
+    assert CachedEmbeddings(backend, EmbeddingStore(str(tmp_path))).model_name == "counting:256"
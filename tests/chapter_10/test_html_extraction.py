@@ -0,0 +1,75 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("html2text")
+
+from langchain_core.documents import Document
+
+from html_extraction import ahtml_to_text, aiter_html_to_text, shared_executor
+
+
+def html_documents(count):
+    return [
+        Document(
+            page_content=f"<html><body><h1>Page {i}</h1><p>Text {i}.</p></body></html>",
+            metadata={"source": f"https://example.com/{i}"},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_results_keep_the_document_order_and_metadata(executor):
+    documents = html_documents(7)
+
+    text_documents = asyncio.run(ahtml_to_text(documents, executor, chunk_size=2))
+
+    assert [d.metadata["source"] for d in text_documents] == [
+        d.metadata["source"] for d in documents
+    ]
+    assert all(f"Page {i}" in d.page_content for i, d in enumerate(text_documents))
+    assert "<h1>" not in text_documents[0].page_content
+
+
+def test_every_index_is_yielded_once(executor):
+    async def collect():
+        return [
+            (index, document.page_content)
+            async for index, document in aiter_html_to_text(
+                html_documents(5), executor, chunk_size=2
+            )
+        ]
+
+    results = asyncio.run(collect())
+
+    assert sorted(index for index, _ in results) == [0, 1, 2, 3, 4]
+    assert all(f"Page {index}" in text for index, text in results)
+
+
+def test_the_default_pool_is_shared_between_calls():
+    assert shared_executor() is shared_executor()
+    assert asyncio.run(ahtml_to_text([])) == []
+
+
+def test_cached_text_is_reused_and_the_rest_is_extracted_in_order(executor):
+    pytest.importorskip("serpapi")
+    from content_collection import aextract_text_from_webpages
+
+    documents = html_documents(3)
+    documents[1].metadata["extracted_text"] = "Cached text."
+
+    text_documents = asyncio.run(
+        aextract_text_from_webpages(documents, executor=executor, chunk_size=1)
+    )
+
+    assert "Page 0" in text_documents[0].page_content
+    assert text_documents[1].page_content == "Cached text."
+    assert "Page 2" in text_documents[2].page_content
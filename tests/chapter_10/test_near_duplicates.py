@@ -0,0 +1,90 @@
+import asyncio
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+from near_duplicates import (
+    NearDuplicateIndex,
+    RankedNearDuplicateFilter,
+    deduplicate_documents,
+)
+from streaming_pipeline import Stage, StreamingPipeline
+
+
+def _random_text(seed, length=300):
+    generator = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(200)]
+    return " ".join(generator.choice(vocabulary) for _ in range(length))
+
+
+def test_index_finds_near_duplicates_only():
+    original = _random_text(0)
+    # A mirrored copy with a different footer:
+    mirrored = original + " Republished with permission"
+    unrelated = _random_text(1)
+
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add("original", original) is None
+    assert index.add("mirrored", mirrored) == "original"
+    assert index.add("unrelated", unrelated) is None
+    assert (index.checked, index.duplicates) == (3, 1)
+
+
+def test_signatures_are_deterministic():
+    text = _random_text(2)
+    assert (NearDuplicateIndex().signature(text) == NearDuplicateIndex().signature(text)).all()
+
+
+def test_deduplicate_documents_keeps_the_highest_ranked_copy():
+    original = _random_text(3)
+    documents = [
+        Document(page_content=_random_text(4), metadata={"source": "a"}),
+        Document(page_content=original, metadata={"source": "b"}),
+        Document(page_content=original.upper(), metadata={"source": "c"}),
+        Document(page_content=_random_text(5), metadata={"source": "d"}),
+    ]
+
+    unique = deduplicate_documents(documents)
+
+    assert [d.metadata["source"] for d in unique] == ["a", "b", "d"]
+
+
+def test_ranked_filter_keeps_the_higher_ranked_copy_when_the_mirror_finishes_first():
+    original = _random_text(6)
+    # The original page is slow to load, and the failed page never arrives:
+    pages = [("original", original, 0.05), ("failed", None, 0), ("mirror", original.upper(), 0)]
+
+    async def run():
+        near_duplicates = RankedNearDuplicateFilter(len(pages))
+
+        async def extract(item):
+            rank, (_, text, delay) = item
+            await asyncio.sleep(delay)
+            if text is None:
+                near_duplicates.skip(rank)
+                return None
+            return item
+
+        async def deduplicate(item):
+            rank, (_, text, _) = item
+            return None if await near_duplicates.add(rank, text) is not None else item
+
+        pipeline = StreamingPipeline(
+            [
+                Stage("extract", extract, concurrency=3),
+                Stage("deduplicate", deduplicate, concurrency=3),
+            ]
+        )
+        finished = [item[1][0] async for _, item in pipeline.stream(enumerate(pages))]
+        return finished, near_duplicates.index.duplicates
+
+    assert asyncio.run(run()) == (["original"], 1)
+
+
+def test_threshold_is_validated():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
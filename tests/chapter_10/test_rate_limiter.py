@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import RateLimitedScheduler, TokenBucket, is_rate_limit_error
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def fake_chat_model(responses, failures=0):
+    """A local chat model that answers with rate limit errors for its first calls."""
+    fake_chat_models = pytest.importorskip("langchain_core.language_models.fake_chat_models")
+
+    class RateLimitedChatModel(fake_chat_models.FakeListChatModel):
+        failures: int = 0
+        calls: int = 0
+
+        async def ainvoke(self, *args, **kwargs):
+            self.calls += 1
+            if self.failures > 0:
+                self.failures -= 1
+                raise RateLimitError("Rate limit reached for requests")
+            return await super().ainvoke(*args, **kwargs)
+
+    return RateLimitedChatModel(responses=responses, failures=failures)
+
+
+def test_token_bucket_waits_for_refill():
+    async def main():
+        bucket = TokenBucket(capacity=10, refill_per_second=100)
+        await bucket.acquire(10)
+        start = time.perf_counter()
+        await bucket.acquire(5)
+        return time.perf_counter() - start
+
+    assert 0.04 <= asyncio.run(main()) < 0.2
+
+
+def test_rate_limit_errors_are_retried_with_backoff():
+    model = fake_chat_model(["summary"], failures=3)
+    scheduler = RateLimitedScheduler(base_delay=0.001, max_delay=0.01)
+
+    result = asyncio.run(scheduler.call(lambda: model.ainvoke("Summarize this"), tokens=10))
+
+    assert result.content == "summary"
+    assert (model.calls, scheduler.retries) == (4, 3)
+
+
+def test_rate_limit_errors_are_raised_after_max_retries():
+    model = fake_chat_model(["summary"], failures=5)
+    scheduler = RateLimitedScheduler(max_retries=2, base_delay=0.001)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(scheduler.call(lambda: model.ainvoke("Summarize this")))
+    assert model.calls == 3
+
+
+def test_other_errors_are_not_retried():
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        raise KeyError("not a rate limit")
+
+    with pytest.raises(KeyError):
+        asyncio.run(RateLimitedScheduler(base_delay=0.001).call(fail))
+    assert len(calls) == 1
+    assert is_rate_limit_error(RateLimitError())
+    assert not is_rate_limit_error(KeyError())
+
+
+def test_max_in_flight_and_result_order():
+    in_flight = []
+    peak = []
+
+    def job(index, delay):
+        async def fn():
+            in_flight.append(index)
+            peak.append(len(in_flight))
+            await asyncio.sleep(delay)
+            in_flight.remove(index)
+            return index
+
+        return fn, 1
+
+    delays = [0.1, 0.01, 0.03, 0.1]
+    scheduler = RateLimitedScheduler(max_in_flight=2)
+
+    completed = asyncio.run(scheduler.run([job(i, d) for i, d in enumerate(delays)]))
+    ordered = asyncio.run(
+        scheduler.run([job(i, d) for i, d in enumerate(delays)], preserve_order=True)
+    )
+
+    assert max(peak) == 2
+    assert completed == [1, 2, 0, 3]
+    assert ordered == [0, 1, 2, 3]
+
+
+def test_tokens_per_minute_limit_spaces_out_requests():
+    async def fn():
+        return time.perf_counter()
+
+    # 6,000 tokens per minute refill at 100 tokens per second:
+    scheduler = RateLimitedScheduler(tokens_per_minute=6_000)
+    start = time.perf_counter()
+    finished = asyncio.run(scheduler.run([(fn, 6_000), (fn, 10)], preserve_order=True))
+
+    assert finished[0] - start < 0.05
+    assert finished[1] - start >= 0.09
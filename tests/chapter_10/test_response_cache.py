@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain.globals import set_llm_cache
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from response_cache import ReplayCacheMiss, ResponseCache, canonical_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(None)
+    cache.close()
+
+
+def test_repeated_calls_are_served_from_the_cache(cache):
+    model = FakeListChatModel(responses=["first", "second"])
+    messages = [SystemMessage(content="Be brief."), HumanMessage(content="Hi")]
+
+    assert model.invoke(messages).content == "first"
+    assert model.invoke(messages).content == "first"
+    assert model.invoke("Something else").content == "second"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_keys_ignore_json_key_order_but_not_parameters():
+    assert canonical_key('{"a": 1, "b": 2}', "model") == canonical_key('{"b":2,"a":1}', "model")
+    assert canonical_key("plain prompt", "temperature=0") != canonical_key(
+        "plain prompt", "temperature=0.6"
+    )
+
+
+def test_replay_mode_never_calls_the_model(tmp_path, cache):
+    model = FakeListChatModel(responses=["cached", "fresh"])
+    assert model.invoke("Hi").content == "cached"
+
+    replay = ResponseCache(str(tmp_path / "responses.sqlite"), replay=True)
+    set_llm_cache(replay)
+    assert model.invoke("Hi").content == "cached"
+    with pytest.raises(ReplayCacheMiss):
+        model.invoke("Not cached")
+    replay.close()
+
+
+def test_old_and_least_recently_used_responses_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=None, max_bytes=0)
+    set_llm_cache(cache)
+    FakeListChatModel(responses=["a"]).invoke("Hi")
+    assert cache.stats()["entries"] == 0
+    set_llm_cache(None)
+    cache.close()
+
+
+def test_calls_outside_langchain_are_cached_and_replayed(cache):
+    calls = []
+
+    def generate_image():
+        calls.append(1)
+        return b'{"artifacts": []}'
+
+    request = {"text_prompts": [{"text": "a meme"}], "steps": 30}
+    assert cache.cached_call("stability", request, generate_image) == b'{"artifacts": []}'
+    assert cache.cached_call("stability", dict(reversed(request.items())), generate_image)
+    assert len(calls) == 1
+
+    cache.replay = True
+    with pytest.raises(ReplayCacheMiss):
+        cache.cached_call("stability", {"text_prompts": []}, generate_image)
+    assert len(calls) == 1
+
+
+def test_missing_embeddings_raise_in_replay_mode(cache, tmp_path):
+    from embedding_cache import CachedEmbeddings, EmbeddingStore
+    from langchain_community.embeddings import FakeEmbeddings
+
+    embeddings = CachedEmbeddings(FakeEmbeddings(size=4), EmbeddingStore(str(tmp_path)))
+    embeddings.embed_documents(["cached"])
+
+    cache.replay = True
+    assert len(embeddings.embed_documents(["cached"])[0]) == 4
+    with pytest.raises(ReplayCacheMiss):
+        embeddings.embed_documents(["cached", "new"])
+    with pytest.raises(ReplayCacheMiss):
+        embeddings.embed_query("new")
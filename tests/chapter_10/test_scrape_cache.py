@@ -0,0 +1,58 @@
+import random
+import string
+import time
+
+from scrape_cache import ScrapeCache, normalize_url
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/a?b=2&utm_source=x&a=1#top") == (
+        "https://example.com/a?a=1&b=2"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+
+
+def test_pages_round_trip_and_share_normalized_keys(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("https://example.com/page") is None
+
+    cache.put("https://example.com/page", "<h1>Hi</h1>", etag='"v1"')
+    cache.put_text("https://example.com/page", "# Hi")
+
+    page = cache.get("https://EXAMPLE.com/page#section")
+    assert page.html == "<h1>Hi</h1>"
+    assert page.text == "# Hi"
+    assert page.is_fresh
+    assert cache.conditional_headers(page) == {"If-None-Match": '"v1"'}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_pages_are_kept_only_when_they_can_be_revalidated(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "cache.sqlite"), ttl=0.01)
+    cache.put("https://example.com/etag", "a", etag='"v1"')
+    cache.put("https://example.com/plain", "b")
+    time.sleep(0.02)
+    # Writing triggers eviction of stale pages without validators:
+    cache.put("https://example.com/new", "c")
+
+    assert cache.get("https://example.com/plain") is None
+    page = cache.get("https://example.com/etag")
+    assert not page.is_fresh
+    cache.touch("https://example.com/etag")
+    assert cache.get("https://example.com/etag").is_fresh
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    # Random letters compress to roughly 1.5KB per page, so two pages fit:
+    cache = ScrapeCache(str(tmp_path / "cache.sqlite"), max_bytes=3500)
+    pages = ["".join(random.choices(string.ascii_letters, k=2000)) for _ in range(4)]
+    for i, page in enumerate(pages[:2], start=1):
+        cache.put(f"https://example.com/{i}", page)
+        time.sleep(0.01)
+    assert cache.get("https://example.com/1")
+    time.sleep(0.01)
+    cache.put("https://example.com/3", pages[2])
+
+    assert cache.get("https://example.com/2") is None
+    assert cache.get("https://example.com/1") and cache.get("https://example.com/3")
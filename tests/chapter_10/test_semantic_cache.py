@@ -0,0 +1,102 @@
+import re
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from semantic_cache import SemanticCache
+
+
+def bag_of_words(texts):
+    """A local stand-in for a sentence-transformers model."""
+    vectors = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[row, zlib.crc32(word.encode()) % 64] += 1
+    return vectors
+
+
+PROMPT = "Ask five interview questions about {topic}, a theory of how ideas spread between people"
+
+
+def test_similar_prompts_hit_and_different_ones_miss():
+    cache = SemanticCache(embed=bag_of_words, threshold=0.9)
+    cache.update("interview", PROMPT.format(topic="memetics"), "questions")
+
+    assert cache.lookup("interview", PROMPT.format(topic="memetics theory")) == "questions"
+    assert cache.lookup("interview", "Write a poem about the sea") is None
+    # The same prompt for another chain is a miss:
+    assert cache.lookup("outline", PROMPT.format(topic="memetics")) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["mean_lookup_ms"] > 0
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = SemanticCache(embed=bag_of_words, threshold=0.99, max_entries=2)
+    cache.update("outline", "alpha beta gamma", "a")
+    cache.update("outline", "delta epsilon zeta", "b")
+    assert cache.lookup("outline", "alpha beta gamma") == "a"
+
+    cache.update("outline", "eta theta iota", "c")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("outline", "delta epsilon zeta") is None
+    assert cache.lookup("outline", "alpha beta gamma") == "a"
+    assert cache.lookup("outline", "eta theta iota") == "c"
+
+
+class CountingChain:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        return self.result
+
+
+def summaries(*key_points):
+    from custom_summarize_chain import DocumentSummary
+
+    return [
+        DocumentSummary(concise_summary="", writing_style="", key_points=[point])
+        for point in key_points
+    ]
+
+
+def test_outline_cache_hits_near_duplicate_topics_with_different_summaries(monkeypatch):
+    pytest.importorskip("langchain_openai")
+    from article_outline_generation import BlogOutline, BlogOutlineGenerator
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    cache = SemanticCache(embed=bag_of_words, threshold=0.8)
+    chain = CountingChain(BlogOutline(title="Memetics", sub_headings=[]))
+
+    def generate_outline(topic, answer, document_summaries):
+        generator = BlogOutlineGenerator(topic, {"Why?": answer}, semantic_cache=cache)
+        generator.outline_chain = chain
+        return generator.generate_outline(document_summaries)
+
+    generate_outline(
+        "memetics",
+        "Ideas spread",
+        summaries("Ideas spread between people like genes", "Richard Dawkins coined the word meme"),
+    )
+    # Other SERP pages for a near-duplicate topic, with similar key points:
+    generate_outline(
+        "memetics theory",
+        "Ideas spread",
+        summaries("Ideas spread between people like genes do", "Dawkins coined the word meme in 1976"),
+    )
+    assert chain.calls == 1
+
+    # Different answers are never served the cached outline:
+    generate_outline("memetics", "They do not", summaries("Ideas spread between people like genes"))
+    assert chain.calls == 2
+    # Neither is an unrelated topic:
+    generate_outline("sourdough baking", "Ideas spread", summaries("Starter needs feeding daily"))
+    assert chain.calls == 3
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from streaming_pipeline import Stage, StreamingPipeline
+
+
+def sleep_stage(name, delays, concurrency=10):
+    async def fn(item):
+        await asyncio.sleep(delays.get(item, 0.01))
+        return item
+
+    return Stage(name, fn, concurrency=concurrency)
+
+
+def test_wall_time_follows_the_slowest_single_path():
+    # Each stage has a different slow item, so stage barriers would add up to 0.6s:
+    pipeline = StreamingPipeline(
+        [
+            sleep_stage("scrape", {0: 0.2}),
+            sleep_stage("extract", {1: 0.2}),
+            sleep_stage("summarize", {2: 0.2}),
+        ]
+    )
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run(range(5)))
+    assert results == [0, 1, 2, 3, 4]
+    assert time.perf_counter() - start < 0.45
+    assert pipeline.metrics["extract"].processed == 5
+    assert pipeline.metrics["extract"].max_seconds >= 0.2
+
+
+def test_results_stream_in_completion_order():
+    pipeline = StreamingPipeline([sleep_stage("slow_first", {0: 0.1})])
+
+    async def collect():
+        return [index async for index, _ in pipeline.stream(range(3))]
+
+    assert asyncio.run(collect())[-1] == 0
+
+
+def test_an_error_in_the_items_is_raised_instead_of_hanging():
+    pipeline = StreamingPipeline([sleep_stage("scrape", {})])
+
+    def items():
+        yield 0
+        yield 1
+        raise ValueError("no more pages")
+
+    async def collect(indices):
+        async for index, _ in pipeline.stream(items()):
+            indices.append(index)
+
+    indices = []
+    with pytest.raises(ValueError, match="no more pages"):
+        asyncio.run(asyncio.wait_for(collect(indices), timeout=5))
+    assert sorted(indices) == [0, 1]
+
+
+def test_failures_and_dropped_items_are_isolated():
+    async def flaky(item):
+        if item == 1:
+            raise RuntimeError("broken page")
+        return None if item == 2 else item * 10
+
+    pipeline = StreamingPipeline([Stage("flaky", flaky, concurrency=2), sleep_stage("next", {})])
+    assert asyncio.run(pipeline.run(range(4))) == [0, None, None, 30]
+    assert isinstance(pipeline.errors[1], RuntimeError)
+    assert pipeline.metrics["flaky"].failed == 1
+    assert pipeline.metrics["flaky"].dropped == 1
+    assert pipeline.metrics["next"].processed == 2
+
+
+def test_bounded_queues_apply_backpressure():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fast(item):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        return item
+
+    async def slow(item):
+        nonlocal in_flight
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        return item
+
+    pipeline = StreamingPipeline(
+        [Stage("fast", fast, concurrency=1, max_queue_size=1), Stage("slow", slow, max_queue_size=2)]
+    )
+    asyncio.run(pipeline.run(range(20)))
+    # At most: one in the slow stage, two queued in front of it, one waiting to be queued:
+    assert max_in_flight <= 4
+
+
+def test_a_pipeline_needs_stages():
+    with pytest.raises(ValueError):
+        StreamingPipeline([])
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+from token_ledger import TokenLedger
+
+
+class WordCountModel(FakeListChatModel):
+    """Counts one token per word, plus 3 tokens of overhead per call."""
+
+    def get_num_tokens_from_messages(self, messages):
+        return 3 + sum(len(message.content.split()) for message in messages)
+
+
+def test_running_total_follows_append_popleft_and_clear():
+    ledger = TokenLedger.from_llm(WordCountModel(responses=[""]))
+    assert ledger.total == 3
+
+    assert ledger.append(AIMessage(content="one two")) == 2
+    ledger.extend([AIMessage(content="three"), AIMessage(content="four five six")])
+    assert (len(ledger), ledger.total) == (3, 3 + 6)
+
+    assert ledger.popleft() == 2
+    assert (len(ledger), ledger.total) == (2, 3 + 4)
+
+    ledger.clear()
+    assert (len(ledger), ledger.total) == (0, 3)
+
+
+def test_memory_summarizes_the_oldest_sections_once_over_the_limit():
+    pytest.importorskip("langchain_openai")
+    from article_generation import OnlyStoreAIMemory
+
+    memory = OnlyStoreAIMemory(
+        llm=WordCountModel(responses=["A summary."]),
+        memory_key="chat_history",
+        return_messages=True,
+        max_token_limit=10,
+    )
+
+    memory.save_context({"human_input": "Write 1"}, {"blog_post": "one two three"})
+    memory.save_context({"human_input": "Write 2"}, {"blog_post": "four five six"})
+    assert memory.moving_summary_buffer == ""
+    assert memory.token_ledger.total == 3 + 6
+
+    memory.save_context({"human_input": "Write 3"}, {"blog_post": "seven eight nine"})
+
+    # Only the AI messages are stored, and the oldest one was summarized away:
+    assert [m.content for m in memory.chat_memory.messages] == [
+        "four five six",
+        "seven eight nine",
+    ]
+    assert memory.token_ledger.total == 3 + 6
+    assert memory.moving_summary_buffer == "A summary."
@@ -0,0 +1,81 @@
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from langchain_core.embeddings import Embeddings
+
+from vector_index import NumpyVectorStore
+
+
+class RandomEmbeddings(Embeddings):
+    """Gives every text a fixed random vector, so nearest neighbours can be checked exactly."""
+
+    def __init__(self, dimensions=16):
+        self.dimensions = dimensions
+
+    def _embed(self, text):
+        return np.random.RandomState(zlib.crc32(text.encode())).standard_normal(self.dimensions).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+TEXTS = [f"chunk number {i}" for i in range(500)]
+
+
+def brute_force_top_k(store, query_vector, k):
+    matrix = np.array(store.embeddings.embed_documents(TEXTS))
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return list(np.argsort(-(matrix @ (query_vector / np.linalg.norm(query_vector))))[:k])
+
+
+def test_numpy_search_matches_brute_force():
+    store = NumpyVectorStore.from_texts(TEXTS, RandomEmbeddings())
+    query = np.array(store.embeddings.embed_query("chunk number 7"))
+
+    similarities, indices = store.search([query], k=5)
+
+    assert list(indices[0]) == brute_force_top_k(store, query, 5)
+    assert indices[0][0] == 7
+    assert similarities[0][0] == pytest.approx(1.0)
+    assert list(similarities[0]) == sorted(similarities[0], reverse=True)
+
+
+def test_retriever_interface_and_k_cap():
+    store = NumpyVectorStore.from_texts(
+        TEXTS[:3], RandomEmbeddings(), metadatas=[{"i": i} for i in range(3)]
+    )
+
+    documents = store.as_retriever(search_kwargs={"k": 10}).invoke("chunk number 1")
+
+    assert len(documents) == 3
+    assert documents[0].page_content == "chunk number 1"
+    assert documents[0].metadata == {"i": 1}
+
+
+def test_added_texts_are_searchable():
+    store = NumpyVectorStore.from_texts(TEXTS[:10], RandomEmbeddings())
+    store.add_texts(["a late chunk"])
+
+    assert store.similarity_search("a late chunk", k=1)[0].page_content == "a late chunk"
+    assert len(store) == 11
+
+
+@pytest.mark.parametrize("backend", ["flat", "ivf"])
+def test_faiss_backends_find_the_same_neighbours(backend):
+    pytest.importorskip("faiss")
+    store = NumpyVectorStore.from_texts(
+        TEXTS, RandomEmbeddings(), backend=backend, nlist=4, nprobe=4
+    )
+    query = np.array(store.embeddings.embed_query("chunk number 42"))
+
+    _, indices = store.search([query], k=5)
+
+    # With nprobe equal to nlist, the IVF index scans every cluster and is exact:
+    assert list(indices[0]) == brute_force_top_k(store, query, 5)
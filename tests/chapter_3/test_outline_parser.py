@@ -0,0 +1,37 @@
+from content.chapter_3.outline_examples import EXPECTED_OUTLINE, openai_result
+from content.chapter_3.outline_parser import (
+    OutlineParser,
+    iter_outline_events,
+    parse_outline,
+)
+
+
+def test_parse_outline_keeps_subheadings_under_their_heading():
+    outline = parse_outline(openai_result)
+    assert list(outline) == ["Introduction", "Efficient Data Management", "Conclusion"]
+    assert outline == EXPECTED_OUTLINE
+
+
+def test_streamed_chunks_build_the_same_outline():
+    for chunk_size in (1, 3, 17, len(openai_result)):
+        parser = OutlineParser()
+        for i in range(0, len(openai_result), chunk_size):
+            parser.feed(openai_result[i : i + chunk_size])
+        parser.close()
+        assert parser.outline == parse_outline(openai_result)
+
+
+def test_events_are_emitted_as_soon_as_a_line_completes():
+    parser = OutlineParser()
+    assert parser.feed("* Introduction") == []
+    assert parser.feed("\n    a. Explanation") == [("Introduction", None)]
+    assert parser.close() == [("Introduction", "Explanation")]
+
+
+def test_iter_outline_events_without_trailing_newline():
+    events = list(iter_outline_events(["* Intro\n  b. Detail", " text"]))
+    assert events == [("Intro", None), ("Intro", "Detail text")]
+
+
+def test_subheadings_before_any_heading_are_ignored():
+    assert parse_outline("  a. Orphan\n* Heading\n  a. Child") == {"Heading": ["Child"]}
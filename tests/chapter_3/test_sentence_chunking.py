@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+pytest.importorskip("tiktoken")
+
+from content.chapter_3 import sentence_chunking
+from content.chapter_3.sentence_chunking import SentenceChunker
+
+
+@pytest.fixture(autouse=True)
+def simple_segmentation(monkeypatch):
+    # Split on full stops and count words, so the tests do not need a spaCy model:
+    def iter_sentence_offsets(texts, **kwargs):
+        for text in texts:
+            yield [m.span() for m in re.finditer(r"[^.]+\.\s*", text)]
+
+    def count_tokens_batch(texts, encoding_name):
+        return [len(text.split()) for text in texts]
+
+    monkeypatch.setattr(sentence_chunking, "iter_sentence_offsets", iter_sentence_offsets)
+    monkeypatch.setattr(sentence_chunking, "count_tokens_batch", count_tokens_batch)
+
+
+text = "One two three. Four five. Six seven eight nine. Ten. Eleven twelve. "
+
+
+def test_chunks_pack_whole_sentences_under_the_budget():
+    chunks = SentenceChunker(chunk_size=5, chunk_overlap=0).split_text(text)
+    assert chunks == [
+        "One two three. Four five. ",
+        "Six seven eight nine. Ten. ",
+        "Eleven twelve. ",
+    ]
+
+
+def test_chunks_repeat_overlap_sentences():
+    chunks = SentenceChunker(chunk_size=6, chunk_overlap=1).split_text(text)
+    assert chunks == [
+        "One two three. Four five. ",
+        "Four five. Six seven eight nine. ",
+        "Six seven eight nine. Ten. ",
+        "Ten. Eleven twelve. ",
+    ]
+
+
+def test_long_documents_are_segmented_in_blocks():
+    long_text = "\n".join([text] * 50)
+    chunker = SentenceChunker(chunk_size=20, chunk_overlap=0, max_block_chars=100)
+    chunks = chunker.split_text(long_text)
+    assert "".join(chunks).split() == long_text.split()
+
+
+def test_split_documents_copies_metadata():
+    class Document:
+        def __init__(self, page_content, metadata):
+            self.page_content = page_content
+            self.metadata = metadata
+
+    documents = SentenceChunker(chunk_size=5, chunk_overlap=0).split_documents(
+        [Document(text, {"source": "https://example.com"})]
+    )
+    assert len(documents) == 3
+    assert all(d.metadata == {"source": "https://example.com"} for d in documents)
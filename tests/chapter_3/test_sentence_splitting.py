@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("spacy")
+
+from content.chapter_3.sentence_splitting import (
+    disable_unused_components,
+    iter_sentence_offsets,
+    load_sentence_pipeline,
+    split_sentences,
+)
+
+
+@pytest.fixture(params=["sentencizer", "trimmed"])
+def mode(request):
+    if request.param != "sentencizer":
+        pytest.importorskip("en_core_web_sm")
+    return request.param
+
+
+def test_abbreviations_do_not_end_a_sentence(mode):
+    text = "Dr. Smith met Mrs. Brown at 10 a.m. today. They talked."
+
+    assert split_sentences(text, mode=mode) == [
+        "Dr. Smith met Mrs. Brown at 10 a.m. today.",
+        "They talked.",
+    ]
+
+
+def test_decimals_do_not_end_a_sentence(mode):
+    text = "The price rose by 3.5 percent to $10.25. Sales fell."
+
+    assert split_sentences(text, mode=mode) == [
+        "The price rose by 3.5 percent to $10.25.",
+        "Sales fell.",
+    ]
+
+
+def test_trailing_text_without_punctuation_is_kept(mode):
+    text = "The first sentence ends here. The second one does not"
+
+    assert split_sentences(text, mode=mode) == [
+        "The first sentence ends here.",
+        "The second one does not",
+    ]
+
+
+def test_offsets_point_into_each_document():
+    texts = ["One. Two!", "No punctuation", ""]
+
+    offsets = list(iter_sentence_offsets(texts, mode="sentencizer"))
+
+    assert [[text[start:end] for start, end in doc] for text, doc in zip(texts, offsets)] == [
+        ["One.", "Two!"],
+        ["No punctuation"],
+        [],
+    ]
+
+
+def test_pipelines_are_loaded_once_and_unknown_modes_raise():
+    assert load_sentence_pipeline("sentencizer") is load_sentence_pipeline("sentencizer")
+    with pytest.raises(ValueError, match="Unknown mode"):
+        load_sentence_pipeline("regex")
+
+
+def test_only_the_unused_components_the_pipeline_has_are_disabled():
+    import spacy
+
+    nlp = spacy.blank("en")
+    if int(spacy.__version__.split(".")[0]) >= 3:
+        for name in ("tagger", "parser", "ner"):
+            nlp.add_pipe(name)
+    else:
+        for name in ("tagger", "parser", "ner"):
+            nlp.add_pipe(nlp.create_pipe(name))
+
+    # e.g. attribute_ruler, lemmatizer and textcat are missing:
+    assert disable_unused_components(nlp) == ["tagger", "ner"]
+    assert nlp.pipe_names == ["parser"]
@@ -0,0 +1,81 @@
+import pytest
+from content.chapter_3.streaming_chunking import (
+    iter_chunk_offsets,
+    iter_chunks,
+    iter_sliding_window_offsets,
+    iter_sliding_windows,
+    mapped_text_file,
+)
+
+
+def sliding_window(text, window_size, step_size):
+    # Reference implementation from content/chapter_3/sliding_window.py:
+    if window_size > len(text) or step_size < 1:
+        return []
+    return [
+        text[i : i + window_size]
+        for i in range(0, len(text) - window_size + step_size, step_size)
+    ]
+
+
+def test_chunks_match_list_comprehension_for_ascii():
+    text = "This is an example of sliding window text chunking." * 20
+    expected = [text[i : i + 200] for i in range(0, len(text), 200)]
+    assert list(iter_chunks(text.encode("utf-8"), 200, as_text=True)) == expected
+
+
+def test_sliding_windows_match_sliding_window_for_ascii():
+    text = "This is an example of sliding window text chunking."
+    expected = sliding_window(text, 20, 5)
+    chunks = list(iter_sliding_windows(text.encode("utf-8"), 20, 5, as_text=True))
+    assert chunks == expected
+
+
+def test_sliding_window_returns_nothing_for_invalid_sizes():
+    buffer = b"short"
+    assert list(iter_sliding_window_offsets(buffer, 10, 1)) == []
+    assert list(iter_sliding_window_offsets(buffer, 2, 0)) == []
+
+
+def test_chunks_never_split_multi_byte_characters():
+    text = "naïve café — 東京 🚀 " * 50
+    buffer = text.encode("utf-8")
+    for chunk_size in range(1, 12):
+        offsets = list(iter_chunk_offsets(buffer, chunk_size))
+        # The chunks cover the buffer without gaps or overlaps:
+        assert offsets[0][0] == 0 and offsets[-1][1] == len(buffer)
+        assert all(a[1] == b[0] for a, b in zip(offsets, offsets[1:]))
+        assert "".join(buffer[s:e].decode("utf-8") for s, e in offsets) == text
+
+
+def test_sliding_windows_decode_for_multi_byte_characters():
+    buffer = ("東京 🚀 " * 30).encode("utf-8")
+    for start, end in iter_sliding_window_offsets(buffer, 16, 3):
+        assert end > start
+        buffer[start:end].decode("utf-8")
+
+
+def test_chunks_are_zero_copy_views():
+    buffer = bytearray(b"abcdefghij")
+    chunk = next(iter_chunks(buffer, 4))
+    buffer[0] = ord("z")
+    assert bytes(chunk) == b"zbcd"
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError):
+        list(iter_chunk_offsets(b"abc", 0))
+
+
+def test_mapped_text_file(tmp_path):
+    path = tmp_path / "corpus.txt"
+    text = "Grüße aus München! " * 100
+    path.write_text(text, encoding="utf-8")
+    with mapped_text_file(str(path)) as buffer:
+        chunks = list(iter_chunks(buffer, 64, as_text=True))
+    assert "".join(chunks) == text
+
+    empty_path = tmp_path / "empty.txt"
+    empty_path.write_text("")
+    with mapped_text_file(str(empty_path)) as buffer:
+        assert list(iter_chunk_offsets(buffer, 64)) == []
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from content.chapter_3.streaming_json_parsing import (
+    StreamingJSONObjectParser,
+    iter_json_entries,
+    parse_llm_json,
+)
+from content.chapter_3.three_json_parsing import openai_json_result
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_matches_json_loads_for_every_chunk_size():
+    expected = json.loads(openai_json_result)
+    for size in (1, 2, 7, 64, len(openai_json_result)):
+        assert dict(iter_json_entries(chunked(openai_json_result, size))) == expected
+
+
+def test_entries_are_emitted_as_soon_as_their_array_closes():
+    parser = StreamingJSONObjectParser()
+    assert parser.feed('{"Introduction": ["a. One", "b. Tw') == []
+    assert parser.feed('o"]') == [("Introduction", ["a. One", "b. Two"])]
+    assert parser.feed(', "Conclusion": ["a. Three"]') == [("Conclusion", ["a. Three"])]
+    assert parser.feed("}") == []
+    assert parser.close() == {
+        "Introduction": ["a. One", "b. Two"],
+        "Conclusion": ["a. Three"],
+    }
+
+
+def test_ignores_code_fences_and_trailing_text():
+    text = "```json\n" + openai_json_result + "```\nLet me know if you need more sections!"
+    assert parse_llm_json(text) == json.loads(openai_json_result)
+
+
+def test_handles_escapes_and_brackets_inside_strings():
+    payload = {"Intro [draft]": ['a. Quote \\"x\\" {y}', "b. ]},"], "Title": "T", "Count": 2}
+    text = json.dumps(payload)
+    for size in (1, 3, len(text)):
+        assert dict(iter_json_entries(chunked(text, size))) == payload
+
+
+def test_close_raises_for_an_unfinished_object():
+    parser = StreamingJSONObjectParser()
+    parser.feed('{"Introduction": ["a. One"]')
+    with pytest.raises(ValueError):
+        parser.close()
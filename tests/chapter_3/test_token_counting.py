@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("tiktoken")
+
+from content.chapter_3.token_counting import (
+    count_tokens,
+    count_tokens_batch,
+    message_overhead,
+    num_tokens_from_messages,
+    token_count_cache,
+)
+
+example_messages = [
+    {
+        "role": "system",
+        "content": "You are a helpful, pattern-following assistant that translates corporate jargon into plain English.",
+    },
+    {
+        "role": "system",
+        "name": "example_user",
+        "content": "New synergies will help drive top-line growth.",
+    },
+    {
+        "role": "system",
+        "name": "example_assistant",
+        "content": "Things working well together will increase revenue.",
+    },
+    {
+        "role": "system",
+        "name": "example_user",
+        "content": "Let's circle back when we have more bandwidth to touch base on opportunities for increased leverage.",
+    },
+    {
+        "role": "system",
+        "name": "example_assistant",
+        "content": "Let's talk later when we're less busy about how to do better.",
+    },
+    {
+        "role": "user",
+        "content": "This late pivot means we don't have time to boil the ocean for the client deliverable.",
+    },
+]
+
+
+def test_num_tokens_from_messages_matches_openai_reference_counts():
+    assert num_tokens_from_messages(example_messages, "gpt-3.5-turbo-0301") == 127
+    assert num_tokens_from_messages(example_messages, "gpt-4-0314") == 129
+
+
+def test_model_aliases_resolve_to_snapshots():
+    assert message_overhead("gpt-4") == message_overhead("gpt-4-0613")
+    assert message_overhead("gpt-3.5-turbo") == message_overhead("gpt-3.5-turbo-0613")
+    with pytest.raises(NotImplementedError):
+        message_overhead("text-davinci-003")
+
+
+def test_batch_counts_use_the_cache():
+    token_count_cache.clear()
+    texts = ["Hello world! This is a test.", "Another prompt.", "Hello world! This is a test."]
+    counts = count_tokens_batch(texts)
+    assert counts == [count_tokens(text) for text in texts]
+    assert counts[0] == counts[2]
+    assert token_count_cache.hits == len(texts)
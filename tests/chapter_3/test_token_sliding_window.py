@@ -0,0 +1,22 @@
+import pytest
+
+tiktoken = pytest.importorskip("tiktoken")
+
+from content.chapter_3.token_sliding_window import TokenSlidingWindow
+
+
+def test_windows_follow_token_stride_and_map_back_to_source():
+    text = "Tokens are counted once, then sliced into overlapping windows. " * 10
+    sliding_window = TokenSlidingWindow(text)
+    encoding = tiktoken.get_encoding("cl100k_base")
+    assert list(sliding_window.tokens) == encoding.encode(text)
+
+    windows = list(sliding_window.windows(window_size=16, step_size=8))
+    assert [w.start_token for w in windows] == list(range(0, len(sliding_window) - 8, 8))
+    for window in windows:
+        assert sliding_window.decode(window) == sliding_window.source_text(window)
+
+
+def test_no_windows_when_window_is_larger_than_document():
+    sliding_window = TokenSlidingWindow("Too short.")
+    assert list(sliding_window.windows(window_size=100, step_size=1)) == []
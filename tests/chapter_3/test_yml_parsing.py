@@ -0,0 +1,94 @@
+import importlib.util
+
+import pytest
+import yaml
+from content.chapter_3 import yml_parsing
+from content.chapter_3.yml_parsing import (
+    InvalidItemKeys,
+    InvalidItemName,
+    InvalidItemQuantity,
+    InvalidItemType,
+    InvalidItemUnit,
+    InvalidResponse,
+    SafeLoader,
+    SchemaValidator,
+    fake_response_1,
+    fake_response_2,
+    fake_response_3,
+    load_response,
+    load_responses,
+    schema,
+    validate_response,
+)
+
+
+def test_validate_response_with_fake_responses():
+    validate_response(yaml.safe_load(fake_response_1), schema)
+    validate_response(yaml.safe_load(fake_response_2), schema)
+    with pytest.raises(InvalidResponse):
+        validate_response(yaml.safe_load(fake_response_3), schema)
+
+
+def test_validator_uses_frozenset_lookups():
+    validator = SchemaValidator(schema)
+    assert validator.allowed_names == frozenset(["Apple Slices", "Milk", "Bread", "Eggs"])
+    assert validator.allowed_units == frozenset(["pieces", "dozen"])
+
+
+@pytest.mark.parametrize(
+    "item, error, message",
+    [
+        ({"item": "Apple Slices", "quantity": 5}, InvalidItemKeys, "correct keys"),
+        ({"item": "Cake", "quantity": 5, "unit": "pieces"}, InvalidItemName, "not in schema"),
+        ({"item": "Eggs", "quantity": "2", "unit": "dozen"}, InvalidItemQuantity, "not an integer"),
+        ({"item": "Eggs", "quantity": 11, "unit": "dozen"}, InvalidItemQuantity, "greater than 10"),
+        ({"item": "Milk", "quantity": 1, "unit": "gallon"}, InvalidItemUnit, "not pieces or dozen"),
+    ],
+)
+def test_validate_raises_the_first_violation(item, error, message):
+    with pytest.raises(error, match=message):
+        SchemaValidator(schema).validate([item])
+
+
+def test_validate_many_reports_all_violations():
+    responses = [
+        yaml.safe_load(fake_response_1),
+        [{"item": "Cake", "quantity": 20, "unit": "gallon"}, "not a dict"],
+        yaml.safe_load(fake_response_3),
+    ]
+    violations = SchemaValidator(schema).validate_many(responses)
+    assert list(violations) == [1, 2]
+    assert [type(v) for v in violations[1]] == [
+        InvalidItemName,
+        InvalidItemQuantity,
+        InvalidItemUnit,
+        InvalidItemType,
+    ]
+    assert [type(v) for v in violations[2]] == [InvalidResponse]
+
+
+def test_loaders_match_safe_load():
+    for response in (fake_response_1, fake_response_2, fake_response_3):
+        assert load_response(response) == yaml.safe_load(response)
+
+    stream = "\n---\n".join([fake_response_1, fake_response_2, fake_response_3])
+    assert list(load_responses(stream)) == list(yaml.safe_load_all(stream))
+
+
+def test_loader_uses_libyaml_when_available():
+    expected = yaml.CSafeLoader if getattr(yaml, "__with_libyaml__", False) else yaml.SafeLoader
+    assert SafeLoader is expected
+
+
+def test_loader_falls_back_to_the_python_loader(monkeypatch):
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+
+    # Load a separate copy of the module, so the one used by the other tests is untouched:
+    spec = importlib.util.spec_from_file_location(
+        "yml_parsing_without_libyaml", yml_parsing.__file__
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    assert module.SafeLoader is yaml.SafeLoader
+    assert module.load_response(fake_response_1) == yaml.safe_load(fake_response_1)